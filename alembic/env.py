@@ -89,7 +89,14 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        # Run the whole upgrade chain in one transaction (Alembic's default, kept
+        # explicit): the CONCURRENTLY index migrations commit around themselves
+        # through autocommit_block(), everything else shares a single COMMIT
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            transaction_per_migration=False,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
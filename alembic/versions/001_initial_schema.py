@@ -10,6 +10,7 @@ from typing import Sequence, Union
 import sqlalchemy as sa
 from alembic import op
 from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex, CreateTable
 
 # revision identifiers, used by Alembic.
 revision: str = "001_initial"
@@ -17,59 +18,32 @@ down_revision: Union[str, None] = None
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
+_ENUM_DDL = (
+    "CREATE TYPE userrole AS ENUM ('owner', 'attendant')",
+    "CREATE TYPE conversationstate AS ENUM "
+    "('INBOUND', 'CAPTURE_MIN', 'QUOTE_READY', 'QUOTE_SENT', "
+    "'WAITING_REPLY', 'HUMAN_APPROVAL', 'WON', 'LOST')",
+    "CREATE TYPE messagedirection AS ENUM ('inbound', 'outbound')",
+    "CREATE TYPE quotestatus AS ENUM ('draft', 'sent', 'expired', 'won', 'lost')",
+    "CREATE TYPE approvalstatus AS ENUM ('pending', 'approved', 'rejected')",
+)
 
-def upgrade() -> None:
-    # Check if migration already applied (tenants table exists)
-    connection = op.get_bind()
-    result = connection.execute(sa.text(
-        "SELECT 1 FROM information_schema.tables WHERE table_name = 'tenants'"
-    )).fetchone()
-    if result:
-        # Migration already applied, skip
-        return
-    
-    # Create enum types (idempotent - check if exists first)
-    # Check and create userrole enum
-    result = connection.execute(sa.text(
-        "SELECT 1 FROM pg_type WHERE typname = 'userrole'"
-    )).fetchone()
-    if not result:
-        op.execute(sa.text("CREATE TYPE userrole AS ENUM ('owner', 'attendant')"))
-    
-    # Check and create conversationstate enum
-    result = connection.execute(sa.text(
-        "SELECT 1 FROM pg_type WHERE typname = 'conversationstate'"
-    )).fetchone()
-    if not result:
-        op.execute(sa.text(
-            "CREATE TYPE conversationstate AS ENUM "
-            "('INBOUND', 'CAPTURE_MIN', 'QUOTE_READY', 'QUOTE_SENT', "
-            "'WAITING_REPLY', 'HUMAN_APPROVAL', 'WON', 'LOST')"
-        ))
-    
-    # Check and create messagedirection enum
-    result = connection.execute(sa.text(
-        "SELECT 1 FROM pg_type WHERE typname = 'messagedirection'"
-    )).fetchone()
-    if not result:
-        op.execute(sa.text("CREATE TYPE messagedirection AS ENUM ('inbound', 'outbound')"))
-    
-    # Check and create quotestatus enum
-    result = connection.execute(sa.text(
-        "SELECT 1 FROM pg_type WHERE typname = 'quotestatus'"
-    )).fetchone()
-    if not result:
-        op.execute(sa.text("CREATE TYPE quotestatus AS ENUM ('draft', 'sent', 'expired', 'won', 'lost')"))
-    
-    # Check and create approvalstatus enum
-    result = connection.execute(sa.text(
-        "SELECT 1 FROM pg_type WHERE typname = 'approvalstatus'"
-    )).fetchone()
-    if not result:
-        op.execute(sa.text("CREATE TYPE approvalstatus AS ENUM ('pending', 'approved', 'rejected')"))
-    
+# to_regclass is a single catalog lookup (resolved via search_path), unlike
+# the information_schema.tables view
+_TENANTS_EXISTS_QUERY = sa.text("SELECT to_regclass('tenants')")
+
+
+def _compile_upgrade_sql() -> str:
+    """Compile the full initial schema DDL to a single SQL batch.
+
+    The schema is static, so this runs once at import time and upgrade() only
+    has to send the resulting string.
+
+    Returns:
+        Semicolon-separated DDL for the enum types, tables and indexes
+    """
     # Create enum type objects for use in table definitions
-    # These reference existing types (created above), so create_type=False prevents recreation
+    # The types themselves are created by the DO blocks below, so create_type=False prevents recreation
     # We must provide the values for SQLAlchemy to understand the enum, but create_type=False
     # tells it not to try to create the type in the database
     userrole_enum = postgresql.ENUM("owner", "attendant", name="userrole", create_type=False)
@@ -81,10 +55,16 @@ def upgrade() -> None:
     messagedirection_enum = postgresql.ENUM("inbound", "outbound", name="messagedirection", create_type=False)
     quotestatus_enum = postgresql.ENUM("draft", "sent", "expired", "won", "lost", name="quotestatus", create_type=False)
     approvalstatus_enum = postgresql.ENUM("pending", "approved", "rejected", name="approvalstatus", create_type=False)
-    
+
+    # Tables are declared on an offline MetaData and compiled to DDL text so the
+    # whole schema goes to the server as one batch instead of one round trip
+    # per CREATE TABLE / CREATE INDEX
+    metadata = sa.MetaData()
+
     # Tenants
-    op.create_table(
+    sa.Table(
         "tenants",
+        metadata,
         sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
         sa.Column("name", sa.String(255), nullable=False),
         sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
@@ -92,8 +72,9 @@ def upgrade() -> None:
     )
 
     # Users
-    op.create_table(
+    sa.Table(
         "users",
+        metadata,
         sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
         sa.Column("tenant_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("tenants.id"), nullable=False),
         sa.Column("email", sa.String(255), nullable=False),
@@ -105,8 +86,9 @@ def upgrade() -> None:
     )
 
     # Channels
-    op.create_table(
+    sa.Table(
         "channels",
+        metadata,
         sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
         sa.Column("tenant_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("tenants.id"), nullable=False),
         sa.Column("waba_id", sa.String(255), nullable=False),
@@ -119,8 +101,9 @@ def upgrade() -> None:
     )
 
     # Items
-    op.create_table(
+    sa.Table(
         "items",
+        metadata,
         sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
         sa.Column("sku", sa.String(255), unique=True, nullable=False),
         sa.Column("name", sa.String(255), nullable=False),
@@ -130,8 +113,9 @@ def upgrade() -> None:
     )
 
     # Tenant Items
-    op.create_table(
+    sa.Table(
         "tenant_items",
+        metadata,
         sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
         sa.Column("tenant_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("tenants.id"), nullable=False),
         sa.Column("item_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("items.id"), nullable=False),
@@ -143,8 +127,9 @@ def upgrade() -> None:
     )
 
     # Pricing Rules
-    op.create_table(
+    sa.Table(
         "pricing_rules",
+        metadata,
         sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
         sa.Column("tenant_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("tenants.id"), nullable=False, unique=True),
         sa.Column("pix_discount_pct", sa.Numeric(5, 4), nullable=False),
@@ -156,8 +141,9 @@ def upgrade() -> None:
     )
 
     # Volume Discounts
-    op.create_table(
+    sa.Table(
         "volume_discounts",
+        metadata,
         sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
         sa.Column("tenant_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("tenants.id"), nullable=False),
         sa.Column("item_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("items.id"), nullable=True),
@@ -168,8 +154,9 @@ def upgrade() -> None:
     )
 
     # Freight Rules
-    op.create_table(
+    sa.Table(
         "freight_rules",
+        metadata,
         sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
         sa.Column("tenant_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("tenants.id"), nullable=False),
         sa.Column("bairro", sa.String(255), nullable=True),
@@ -182,8 +169,9 @@ def upgrade() -> None:
     )
 
     # Contacts
-    op.create_table(
+    sa.Table(
         "contacts",
+        metadata,
         sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
         sa.Column("tenant_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("tenants.id"), nullable=False),
         sa.Column("phone", sa.String(20), nullable=False),
@@ -194,8 +182,9 @@ def upgrade() -> None:
     )
 
     # Conversations
-    op.create_table(
+    sa.Table(
         "conversations",
+        metadata,
         sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
         sa.Column("tenant_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("tenants.id"), nullable=False),
         sa.Column("contact_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("contacts.id"), nullable=False),
@@ -205,12 +194,13 @@ def upgrade() -> None:
         sa.Column("last_message_at", sa.DateTime(timezone=True), nullable=False),
         sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
         sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Index("idx_conversations_tenant_state", "tenant_id", "state"),
     )
-    op.create_index("idx_conversations_tenant_state", "conversations", ["tenant_id", "state"])
 
     # Messages
-    op.create_table(
+    sa.Table(
         "messages",
+        metadata,
         sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
         sa.Column("tenant_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("tenants.id"), nullable=False),
         sa.Column("conversation_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("conversations.id"), nullable=True),
@@ -220,13 +210,14 @@ def upgrade() -> None:
         sa.Column("raw_payload", postgresql.JSONB(), nullable=False),
         sa.Column("text_content", sa.Text(), nullable=True),
         sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Index("idx_messages_provider_id", "provider_message_id"),
+        sa.Index("idx_messages_tenant_id", "tenant_id"),
     )
-    op.create_index("idx_messages_provider_id", "messages", ["provider_message_id"])
-    op.create_index("idx_messages_tenant_id", "messages", ["tenant_id"])
 
     # Quotes
-    op.create_table(
+    sa.Table(
         "quotes",
+        metadata,
         sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
         sa.Column("tenant_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("tenants.id"), nullable=False),
         sa.Column("conversation_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("conversations.id"), nullable=False),
@@ -241,12 +232,13 @@ def upgrade() -> None:
         sa.Column("payload_json", postgresql.JSONB(), nullable=False),
         sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
         sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Index("idx_quotes_tenant_id", "tenant_id"),
     )
-    op.create_index("idx_quotes_tenant_id", "quotes", ["tenant_id"])
 
     # Approvals
-    op.create_table(
+    sa.Table(
         "approvals",
+        metadata,
         sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
         sa.Column("tenant_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("tenants.id"), nullable=False),
         sa.Column("quote_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("quotes.id"), nullable=False),
@@ -256,12 +248,13 @@ def upgrade() -> None:
         sa.Column("approved_at", sa.DateTime(timezone=True), nullable=True),
         sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
         sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Index("idx_approvals_tenant_status", "tenant_id", "status"),
     )
-    op.create_index("idx_approvals_tenant_status", "approvals", ["tenant_id", "status"])
 
     # Audit Log
-    op.create_table(
+    sa.Table(
         "audit_log",
+        metadata,
         sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
         sa.Column("tenant_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("tenants.id"), nullable=False),
         sa.Column("entity_type", sa.String(50), nullable=False),
@@ -273,26 +266,63 @@ def upgrade() -> None:
         sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
     )
 
+    dialect = postgresql.dialect()
+    statements = [
+        # Everything runs in Alembic's migration transaction. Skip waiting on
+        # the WAL flush at commit: a crash just before it leaves the database
+        # without tenants, and this migration simply runs again
+        "SET LOCAL synchronous_commit = off",
+        # Create enum types (idempotent - duplicate_object is swallowed
+        # server-side, so there is no check-then-create race and no pre-flight
+        # pg_type lookup)
+        *(
+            "DO $$ BEGIN "
+            f"{create_type_sql}; "
+            "EXCEPTION WHEN duplicate_object THEN NULL; "
+            "END $$"
+            for create_type_sql in _ENUM_DDL
+        ),
+    ]
+    statements.extend(
+        str(CreateTable(table).compile(dialect=dialect)).strip()
+        for table in metadata.sorted_tables
+    )
+    # Indexes are built once every table exists. CONCURRENTLY would buy nothing
+    # here: the tables are brand new and empty, and it cannot run inside the
+    # migration transaction anyway
+    statements.extend(
+        str(CreateIndex(index).compile(dialect=dialect)).strip()
+        for table in metadata.sorted_tables
+        for index in sorted(table.indexes, key=lambda idx: idx.name)
+    )
+    return ";\n".join(statements)
 
-def downgrade() -> None:
-    op.drop_table("audit_log")
-    op.drop_table("approvals")
-    op.drop_table("quotes")
-    op.drop_table("messages")
-    op.drop_table("conversations")
-    op.drop_table("contacts")
-    op.drop_table("freight_rules")
-    op.drop_table("volume_discounts")
-    op.drop_table("pricing_rules")
-    op.drop_table("tenant_items")
-    op.drop_table("items")
-    op.drop_table("channels")
-    op.drop_table("users")
-    op.drop_table("tenants")
-
-    op.execute("DROP TYPE approvalstatus")
-    op.execute("DROP TYPE quotestatus")
-    op.execute("DROP TYPE messagedirection")
-    op.execute("DROP TYPE conversationstate")
-    op.execute("DROP TYPE userrole")
 
+_UPGRADE_SQL = _compile_upgrade_sql()
+
+
+def upgrade() -> None:
+    # Check if migration already applied (tenants table exists)
+    connection = op.get_bind()
+    result = connection.execute(_TENANTS_EXISTS_QUERY).scalar()
+    if result is not None:
+        # Migration already applied, skip
+        return
+
+    connection.exec_driver_sql(_UPGRADE_SQL)
+
+
+def downgrade() -> None:
+    connection = op.get_bind()
+    # Dropping every table in one statement lets PostgreSQL resolve the foreign
+    # keys between them, so no CASCADE is needed (or wanted: it would silently
+    # take along anything else that still depends on these tables)
+    connection.exec_driver_sql(
+        "DROP TABLE IF EXISTS audit_log, approvals, quotes, messages, conversations, "
+        "contacts, freight_rules, volume_discounts, pricing_rules, tenant_items, items, "
+        "channels, users, tenants"
+    )
+    connection.exec_driver_sql(
+        "DROP TYPE IF EXISTS approvalstatus, quotestatus, messagedirection, "
+        "conversationstate, userrole"
+    )
@@ -6,8 +6,7 @@ Create Date: 2024-12-19
 
 """
 from alembic import op
-import sqlalchemy as sa
-
+from app.db.migration_ops import create_index_concurrently
 
 # revision identifiers, used by Alembic.
 revision = '007_add_missing_indexes'
@@ -17,19 +16,23 @@ depends_on = None
 
 
 def upgrade():
-    # Add indexes for quotes.status and quotes.tenant_id + status
-    op.create_index('idx_quotes_status', 'quotes', ['status'])
-    op.create_index('idx_quotes_tenant_status', 'quotes', ['tenant_id', 'status'])
+    # Add indexes for quotes.status and quotes.tenant_id + status.
+    # Built CONCURRENTLY so writes to quotes are not blocked during the build;
+    # that cannot run inside a transaction, hence the autocommit block. An
+    # interrupted build leaves an INVALID index, which the helper drops and
+    # rebuilds on the next run (IF NOT EXISTS alone would keep it).
+    with op.get_context().autocommit_block():
+        create_index_concurrently('idx_quotes_status', 'quotes', ['status'])
+        create_index_concurrently('idx_quotes_tenant_status', 'quotes', ['tenant_id', 'status'])
 
 
 def downgrade():
-    op.drop_index('idx_quotes_tenant_status', table_name='quotes')
-    op.drop_index('idx_quotes_status', table_name='quotes')
-
-
-
-
-
-
-
-
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'idx_quotes_tenant_status', table_name='quotes',
+            postgresql_concurrently=True, if_exists=True,
+        )
+        op.drop_index(
+            'idx_quotes_status', table_name='quotes',
+            postgresql_concurrently=True, if_exists=True,
+        )
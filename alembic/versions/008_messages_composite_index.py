@@ -0,0 +1,53 @@
+"""replace single-column message indexes with a composite index
+
+Revision ID: 008_messages_composite_index
+Revises: 007_add_missing_indexes
+Create Date: 2025-01-10 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+from app.db.migration_ops import create_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision: str = "008_messages_composite_index"
+down_revision: Union[str, None] = "007_add_missing_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # messages takes a write for every inbound and outbound message, so the
+    # swap runs CONCURRENTLY (outside the migration transaction). The composite
+    # index is built before the old ones are dropped, so tenant lookups always
+    # have an index to use
+    with op.get_context().autocommit_block():
+        # Serves tenant-scoped lookups (tenant_id prefix) as well as a
+        # conversation's messages in time order without an extra sort
+        create_index_concurrently(
+            "idx_messages_tenant_conv_created",
+            "messages",
+            ["tenant_id", "conversation_id", sa.text("created_at DESC")],
+        )
+        op.drop_index(
+            "idx_messages_tenant_id", table_name="messages",
+            postgresql_concurrently=True, if_exists=True,
+        )
+        # provider_message_id is already covered by the unique constraint's index
+        op.drop_index(
+            "idx_messages_provider_id", table_name="messages",
+            postgresql_concurrently=True, if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        create_index_concurrently("idx_messages_tenant_id", "messages", ["tenant_id"])
+        create_index_concurrently("idx_messages_provider_id", "messages", ["provider_message_id"])
+        op.drop_index(
+            "idx_messages_tenant_conv_created", table_name="messages",
+            postgresql_concurrently=True, if_exists=True,
+        )
@@ -0,0 +1,67 @@
+"""compress large JSONB columns with lz4
+
+Revision ID: 010_jsonb_lz4_compression
+Revises: 009_audit_log_created_at_brin
+Create Date: 2025-01-10 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "010_jsonb_lz4_compression"
+down_revision: Union[str, None] = "009_audit_log_created_at_brin"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# JSONB columns that routinely hold payloads large enough to be TOASTed
+_JSONB_COLUMNS = (
+    ("messages", "raw_payload"),
+    ("quotes", "items_json"),
+    ("quotes", "payload_json"),
+    ("audit_log", "before_json"),
+    ("audit_log", "after_json"),
+)
+
+_LZ4_SUPPORTED_QUERY = sa.text(
+    "SELECT current_setting('server_version_num')::int >= 140000 "
+    "AND EXISTS (SELECT 1 FROM pg_settings "
+    "WHERE name = 'default_toast_compression' AND 'lz4' = ANY(enumvals))"
+)
+
+
+def _lz4_supported() -> bool:
+    """Check whether the server can compress TOASTed values with lz4.
+
+    Per-column compression needs PostgreSQL 14+, and lz4 is only offered when
+    the server was built with it.
+
+    Returns:
+        True if lz4 is an accepted compression method
+    """
+    return bool(op.get_bind().execute(_LZ4_SUPPORTED_QUERY).scalar())
+
+
+def _set_compression(method: str) -> None:
+    # Only affects newly written values; existing rows keep their compression
+    # until rewritten, so this is a cheap catalog-only change
+    op.execute("; ".join(
+        f"ALTER TABLE {table} ALTER COLUMN {column} SET COMPRESSION {method}"
+        for table, column in _JSONB_COLUMNS
+    ))
+
+
+def upgrade() -> None:
+    if not _lz4_supported():
+        # Keep the server default (pglz)
+        return
+    _set_compression("lz4")
+
+
+def downgrade() -> None:
+    if not _lz4_supported():
+        return
+    _set_compression("default")
@@ -0,0 +1,66 @@
+"""store enum columns as smallint codes
+
+Revision ID: 011_enum_columns_to_smallint
+Revises: 010_jsonb_lz4_compression
+Create Date: 2025-01-10 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "011_enum_columns_to_smallint"
+down_revision: Union[str, None] = "010_jsonb_lz4_compression"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column, enum type, labels in code order). Must match the EnumCode
+# member order in app/db/models.py
+_ENUM_COLUMNS = (
+    ("users", "role", "userrole", ("owner", "attendant")),
+    (
+        "conversations",
+        "state",
+        "conversationstate",
+        (
+            "INBOUND", "CAPTURE_MIN", "QUOTE_READY", "QUOTE_SENT",
+            "WAITING_REPLY", "HUMAN_APPROVAL", "WON", "LOST",
+        ),
+    ),
+    ("messages", "direction", "messagedirection", ("inbound", "outbound")),
+    ("quotes", "status", "quotestatus", ("draft", "sent", "expired", "won", "lost")),
+    ("approvals", "status", "approvalstatus", ("pending", "approved", "rejected")),
+)
+
+
+def upgrade() -> None:
+    statements = []
+    for table, column, _type_name, labels in _ENUM_COLUMNS:
+        cases = " ".join(f"WHEN '{label}' THEN {code}" for code, label in enumerate(labels))
+        statements.append(
+            f"ALTER TABLE {table} ALTER COLUMN {column} TYPE smallint "
+            f"USING (CASE {column}::text {cases} END)"
+        )
+        statements.append(
+            f"ALTER TABLE {table} ADD CONSTRAINT ck_{table}_{column} "
+            f"CHECK ({column} BETWEEN 0 AND {len(labels) - 1})"
+        )
+    statements.append(
+        "DROP TYPE " + ", ".join(type_name for _, _, type_name, _ in _ENUM_COLUMNS)
+    )
+    op.execute(";\n".join(statements))
+
+
+def downgrade() -> None:
+    statements = []
+    for table, column, type_name, labels in _ENUM_COLUMNS:
+        values = ", ".join(f"'{label}'" for label in labels)
+        cases = " ".join(f"WHEN {code} THEN '{label}'" for code, label in enumerate(labels))
+        statements.append(f"CREATE TYPE {type_name} AS ENUM ({values})")
+        statements.append(f"ALTER TABLE {table} DROP CONSTRAINT ck_{table}_{column}")
+        statements.append(
+            f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {type_name} "
+            f"USING (CASE {column} {cases} END)::{type_name}"
+        )
+    op.execute(";\n".join(statements))
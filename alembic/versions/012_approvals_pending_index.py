@@ -0,0 +1,40 @@
+"""add partial index for pending approvals
+
+Revision ID: 012_approvals_pending_index
+Revises: 011_enum_columns_to_smallint
+Create Date: 2025-01-10 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+from app.db.migration_ops import create_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision: str = "012_approvals_pending_index"
+down_revision: Union[str, None] = "011_enum_columns_to_smallint"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Approval queues only ever list a tenant's pending approvals, newest first.
+    # Indexing just that hot set keeps the index small regardless of how many
+    # approvals have been decided (status 0 = pending, see EnumCode in models)
+    with op.get_context().autocommit_block():
+        create_index_concurrently(
+            "idx_approvals_tenant_pending",
+            "approvals",
+            ["tenant_id", sa.text("created_at DESC")],
+            postgresql_where=sa.text("status = 0"),
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "idx_approvals_tenant_pending", table_name="approvals",
+            postgresql_concurrently=True, if_exists=True,
+        )
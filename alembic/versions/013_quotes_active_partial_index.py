@@ -0,0 +1,48 @@
+"""replace quotes status index with a partial index on open quotes
+
+Revision ID: 013_quotes_active_partial_index
+Revises: 012_approvals_pending_index
+Create Date: 2025-01-10 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+from app.db.migration_ops import create_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision: str = "013_quotes_active_partial_index"
+down_revision: Union[str, None] = "012_approvals_pending_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # quotes is written on every quote and approval, so the swap runs
+    # CONCURRENTLY (in an autocommit block, outside the migration transaction)
+    with op.get_context().autocommit_block():
+        # Low-cardinality status on its own is never selective enough to be used;
+        # tenant-scoped status lookups go through idx_quotes_tenant_status
+        op.drop_index(
+            "idx_quotes_status", table_name="quotes",
+            postgresql_concurrently=True, if_exists=True,
+        )
+        # Open quotes (0 = draft, 1 = sent, see EnumCode in models) listed per
+        # tenant, newest first
+        create_index_concurrently(
+            "idx_quotes_tenant_status_active",
+            "quotes",
+            ["tenant_id", "status", sa.text("created_at DESC")],
+            postgresql_where=sa.text("status IN (0, 1)"),
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "idx_quotes_tenant_status_active", table_name="quotes",
+            postgresql_concurrently=True, if_exists=True,
+        )
+        create_index_concurrently("idx_quotes_status", "quotes", ["status"])
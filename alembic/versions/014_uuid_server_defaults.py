@@ -0,0 +1,50 @@
+"""generate primary key UUIDs server-side by default
+
+Revision ID: 014_uuid_server_defaults
+Revises: 013_quotes_active_partial_index
+Create Date: 2025-01-10 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "014_uuid_server_defaults"
+down_revision: Union[str, None] = "013_quotes_active_partial_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_TABLES = (
+    "tenants",
+    "users",
+    "channels",
+    "items",
+    "tenant_items",
+    "pricing_rules",
+    "volume_discounts",
+    "freight_rules",
+    "contacts",
+    "conversations",
+    "messages",
+    "quotes",
+    "approvals",
+    "audit_log",
+    "message_templates",
+)
+
+
+def upgrade() -> None:
+    # gen_random_uuid() is built in since PostgreSQL 13, no pgcrypto needed.
+    # Setting a default is catalog-only; existing rows are untouched
+    op.execute(";\n".join(
+        f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT gen_random_uuid()"
+        for table in _TABLES
+    ))
+
+
+def downgrade() -> None:
+    op.execute(";\n".join(
+        f"ALTER TABLE {table} ALTER COLUMN id DROP DEFAULT"
+        for table in _TABLES
+    ))
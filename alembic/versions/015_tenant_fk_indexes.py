@@ -0,0 +1,70 @@
+"""index tenant foreign keys and tenant-scoped recency lookups
+
+Revision ID: 015_tenant_fk_indexes
+Revises: 014_uuid_server_defaults
+Create Date: 2025-01-10 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+from app.db.migration_ops import create_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision: str = "015_tenant_fk_indexes"
+down_revision: Union[str, None] = "014_uuid_server_defaults"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, table, columns). Only tables whose tenant_id is not already the leading
+# column of an index; the rest (users, contacts, conversations, messages, quotes,
+# approvals, tenant_items, pricing_rules, message_templates) are covered
+_INDEXES = (
+    # Latest messages per tenant (dashboard, operator view)
+    ("idx_messages_tenant_created", "messages", ["tenant_id", sa.text("created_at DESC")]),
+    # Conversation history; also covers the conversation_id foreign key
+    (
+        "idx_messages_conversation_created",
+        "messages",
+        ["conversation_id", sa.text("created_at DESC")],
+    ),
+    # Conversation list, most recently active first
+    (
+        "idx_conversations_tenant_last_message",
+        "conversations",
+        ["tenant_id", sa.text("last_message_at DESC")],
+    ),
+    # Quote list, newest first (supersedes idx_quotes_tenant_id, dropped below)
+    ("idx_quotes_tenant_created", "quotes", ["tenant_id", sa.text("created_at DESC")]),
+    # Operator audit view filtered by tenant
+    ("idx_audit_log_tenant_created", "audit_log", ["tenant_id", sa.text("created_at DESC")]),
+    ("idx_freight_rules_tenant_created", "freight_rules", ["tenant_id", "created_at"]),
+    # Small tables, indexed so tenant deletes don't scan them
+    ("idx_channels_tenant_id", "channels", ["tenant_id"]),
+    ("idx_volume_discounts_tenant_id", "volume_discounts", ["tenant_id"]),
+)
+
+
+def upgrade() -> None:
+    # messages and conversations are written on every inbound message (and
+    # audit_log on every approval): a plain CREATE INDEX would block those
+    # writes for the whole build
+    with op.get_context().autocommit_block():
+        for name, table, columns in _INDEXES:
+            create_index_concurrently(name, table, columns)
+        op.drop_index(
+            "idx_quotes_tenant_id", table_name="quotes",
+            postgresql_concurrently=True, if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        create_index_concurrently("idx_quotes_tenant_id", "quotes", ["tenant_id"])
+        for name, table, _columns in reversed(_INDEXES):
+            op.drop_index(
+                name, table_name=table,
+                postgresql_concurrently=True, if_exists=True,
+            )
@@ -0,0 +1,43 @@
+"""unique partial index on active channels by phone_number_id
+
+Revision ID: 016_channels_active_pnid_index
+Revises: 015_tenant_fk_indexes
+Create Date: 2025-01-10 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+from app.db.migration_ops import create_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision: str = "016_channels_active_pnid_index"
+down_revision: Union[str, None] = "015_tenant_fk_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # If two active channels already share a number the unique build fails
+    # and leaves an INVALID index; deactivate the duplicate and re-run (the
+    # helper replaces the invalid index)
+    with op.get_context().autocommit_block():
+        # Inbound webhooks are routed to a channel by phone_number_id, so at
+        # most one active channel may own a number
+        create_index_concurrently(
+            "idx_channels_active_phone_number_id",
+            "channels",
+            ["phone_number_id"],
+            unique=True,
+            postgresql_where=sa.text("is_active"),
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "idx_channels_active_phone_number_id", table_name="channels",
+            postgresql_concurrently=True, if_exists=True,
+        )
@@ -0,0 +1,41 @@
+"""partial index on tenants.stripe_customer_id
+
+Revision ID: 017_tenants_stripe_customer_idx
+Revises: 016_channels_active_pnid_index
+Create Date: 2025-01-10 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+from app.db.migration_ops import create_index_concurrently
+
+# revision identifiers, used by Alembic.
+revision: str = "017_tenants_stripe_customer_idx"
+down_revision: Union[str, None] = "016_channels_active_pnid_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Built concurrently so onboarding steps and Stripe webhooks can keep
+    # updating tenants during the build
+    with op.get_context().autocommit_block():
+        # Stripe subscription webhooks find the tenant by customer id; tenants
+        # that never checked out have none, so they are left out
+        create_index_concurrently(
+            "idx_tenants_stripe_customer_id",
+            "tenants",
+            ["stripe_customer_id"],
+            postgresql_where=sa.text("stripe_customer_id IS NOT NULL"),
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "idx_tenants_stripe_customer_id", table_name="tenants",
+            postgresql_concurrently=True, if_exists=True,
+        )
@@ -8,34 +8,59 @@ from pydantic import BaseModel, Field
 class WhatsAppText(BaseModel):
     """WhatsApp text message content."""
 
-    body: str
+    body: str = ""
 
 
 class WhatsAppMessage(BaseModel):
-    """WhatsApp message from webhook."""
+    """WhatsApp message from webhook.
 
-    id: str = Field(alias="id")  # provider_message_id
-    from_: str = Field(alias="from")
-    type: str
+    Fields are optional and each message is validated on its own (see
+    WhatsAppValue.messages): a malformed message is skipped instead of failing
+    the whole webhook.
+    """
+
+    id: str | None = Field(None, alias="id")  # provider_message_id
+    from_: str | None = Field(None, alias="from")
+    type: str = "unknown"
     text: WhatsAppText | None = None
-    timestamp: str
+    timestamp: str | None = None
+
+
+class WhatsAppMetadata(BaseModel):
+    """WhatsApp webhook value metadata (business phone number)."""
+
+    phone_number_id: str | None = None
 
 
 class WhatsAppValue(BaseModel):
-    """WhatsApp webhook value."""
+    """WhatsApp webhook value.
+
+    Everything is optional: non-message fields (template status, account
+    updates, ...) send differently shaped values and must still be accepted.
+    """
 
-    messaging_product: str
-    metadata: dict[str, Any]
-    contacts: list[dict[str, Any]] | None = None
-    messages: list[WhatsAppMessage] | None = None
-    statuses: list[dict[str, Any]] | None = None
+    messaging_product: str | None = None
+    metadata: WhatsAppMetadata | None = None
+    # Passed through as parsed (Any skips per-item dict validation and copying)
+    contacts: list[Any] | None = None
+    # Raw message dicts: each is validated into WhatsAppMessage by the handler,
+    # and the original is what gets stored as raw_payload
+    messages: list[Any] | None = None
+    statuses: list[Any] | None = None
+
+
+class WhatsAppChange(BaseModel):
+    """WhatsApp webhook change."""
+
+    field: str | None = None
+    value: WhatsAppValue = Field(default_factory=WhatsAppValue)
 
 
 class WhatsAppWebhookEntry(BaseModel):
     """WhatsApp webhook entry."""
 
     id: str
-    changes: list[dict[str, Any]]
+    changes: list[WhatsAppChange]
 
 
 class WhatsAppWebhookPayload(BaseModel):
@@ -43,5 +68,3 @@ class WhatsAppWebhookPayload(BaseModel):
 
     object: str
     entry: list[WhatsAppWebhookEntry]
-
-
@@ -1,35 +1,145 @@
 """WhatsApp message sender."""
 
+import atexit
 import logging
+from datetime import timedelta
+from functools import lru_cache
 from typing import Any
 from uuid import UUID
 
 import httpx
+import orjson
 
-from app.core.retry import retry_with_backoff
+from app.core.retry import retry_with_backoff, retry_with_backoff_async
 from app.db.models import Channel
 from app.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Free-form messages can only be sent within 24 hours of the customer's last
+# message (WhatsApp customer service window)
+WHATSAPP_WINDOW = timedelta(hours=24)
 
-def send_text_message(
+# Failed connection attempts are retried by the transport itself (nothing has
+# been sent yet, so they are always safe to repeat)
+_CONNECT_RETRIES = 3
+
+# Pool sizing for the shared clients; idle connections are kept for a minute so
+# bursts of sends skip the TCP/TLS handshake. Passed to the transport, since
+# httpx ignores client-level limits when a transport is given
+_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=20,
+    keepalive_expiry=60.0,
+)
+
+# graph.facebook.com negotiates HTTP/2 over ALPN: concurrent sends multiplex over
+# one connection and HPACK compresses the repeated headers. Falls back to
+# HTTP/1.1 if the server doesn't offer it
+_HTTP2 = True
+
+# Sent on every request; the per-token Authorization header is added per send
+_BASE_HEADERS = {"Content-Type": "application/json"}
+
+
+class _WhatsAppServerError(httpx.HTTPStatusError):
+    """5xx response from the Cloud API (transient, retried)."""
+
+
+class _WhatsAppClientError(Exception):
+    """4xx response from the Cloud API (permanent, not retried).
+
+    Only keeps the status code and body: 4xx is an expected outcome (bad
+    number, expired token), so it carries no request/response objects and is
+    logged without a traceback.
+    """
+
+    __slots__ = ("status", "text")
+
+    def __init__(self, status: int, text: str):
+        self.status = status
+        self.text = text
+        super().__init__(f"Client error: {status}")
+
+
+# Retry on timeouts, dropped connections and 5xx status codes only
+# Don't retry on 4xx (client errors) - those are permanent
+# RemoteProtocolError: the shared HTTP/2 connection was closed under the request
+# (server GOAWAY or reset); the retry goes out on a fresh connection
+_RETRYABLE_EXCEPTIONS = (
+    httpx.TimeoutException,
+    httpx.ReadError,
+    httpx.WriteError,
+    httpx.RemoteProtocolError,
+    _WhatsAppServerError,
+)
+
+_client: httpx.Client | None = None
+_async_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.Client:
+    """Get the shared HTTP client for the WhatsApp Cloud API (singleton).
+
+    Reusing one client keeps connections to graph.facebook.com alive, so only
+    the first send pays for DNS, TCP and TLS setup.
+    """
+    global _client
+    if _client is None:
+        _client = httpx.Client(
+            timeout=settings.whatsapp_api_timeout,
+            headers=_BASE_HEADERS,
+            transport=httpx.HTTPTransport(
+                http2=_HTTP2, limits=_LIMITS, retries=_CONNECT_RETRIES
+            ),
+        )
+        atexit.register(_client.close)
+    return _client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Get the shared async HTTP client for the WhatsApp Cloud API (singleton)."""
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(
+            timeout=settings.whatsapp_api_timeout,
+            headers=_BASE_HEADERS,
+            transport=httpx.AsyncHTTPTransport(
+                http2=_HTTP2, limits=_LIMITS, retries=_CONNECT_RETRIES
+            ),
+        )
+    return _async_client
+
+
+async def close_async_http_client() -> None:
+    """Close the shared async HTTP client (called on app shutdown)."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+
+@lru_cache(maxsize=64)
+def _url_for(phone_number_id: str) -> str:
+    """Messages endpoint for a phone number ID (cached per ID)."""
+    return f"https://graph.facebook.com/v18.0/{phone_number_id}/messages"
+
+
+@lru_cache(maxsize=8)
+def _headers_for(access_token: str) -> dict[str, str]:
+    """Per-request headers for an access token (cached per token, do not mutate)."""
+    return {"Authorization": f"Bearer {access_token}"}
+
+
+def _prepare_request(
     channel: Channel,
     to_phone: str,
     message_text: str,
-) -> str | None:
-    """Send a text message via WhatsApp Cloud API.
-
-    Args:
-        channel: Channel configuration
-        to_phone: Recipient phone number (E.164 format, e.g., +5511999999999)
-        message_text: Message text content
-
-    Returns:
-        Provider message ID if successful, None otherwise
+) -> tuple[str, dict[str, str], bytes, dict[str, Any]]:
+    """Build URL, headers, JSON body and log context for a text message.
 
     Raises:
-        Exception: If message sending fails
+        ValueError: If the channel has no access token or phone_number_id
     """
     # Use access token from settings (for MVP)
     # In production, would decrypt channel.access_token_encrypted
@@ -38,23 +148,23 @@ def send_text_message(
 
     if not access_token:
         raise ValueError(f"No access token available for channel {channel.id}")
-    
+
     if not phone_number_id:
         raise ValueError(f"No phone_number_id available for channel {channel.id}")
 
-    url = f"https://graph.facebook.com/v18.0/{phone_number_id}/messages"
-
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json",
-    }
+    url = _url_for(phone_number_id)
+    headers = _headers_for(access_token)
 
-    payload = {
-        "messaging_product": "whatsapp",
-        "to": to_phone,
-        "type": "text",
-        "text": {"body": message_text},
-    }
+    # Serialized once here (and reused across retries); Content-Type is set by
+    # the client's base headers
+    body = orjson.dumps(
+        {
+            "messaging_product": "whatsapp",
+            "to": to_phone,
+            "type": "text",
+            "text": {"body": message_text},
+        }
+    )
 
     log_extra = {
         "provider_message_id": None,  # Will be set after response
@@ -62,76 +172,155 @@ def send_text_message(
         "to_phone": to_phone,
     }
 
+    return url, headers, body, log_extra
+
+
+def _parse_response(response: httpx.Response) -> dict[str, Any]:
+    """Raise on error status codes, otherwise return the JSON body."""
+    # Check for 5xx errors (retry) vs 4xx errors (don't retry)
+    if response.status_code >= 500:
+        # 5xx errors should be retried
+        raise _WhatsAppServerError(
+            f"Server error: {response.status_code}",
+            request=response.request,
+            response=response,
+        )
+    elif response.status_code >= 400:
+        # 4xx errors are client errors, don't retry - raise special exception
+        raise _WhatsAppClientError(response.status_code, response.text)
+    return response.json()
+
+
+def _extract_message_id(result: dict[str, Any], log_extra: dict[str, Any]) -> str | None:
+    """Pull the provider message ID out of a send response and log the outcome."""
+    provider_message_id = result.get("messages", [{}])[0].get("id")
+
+    if provider_message_id:
+        log_extra["provider_message_id"] = provider_message_id
+        logger.info(
+            "Message sent successfully: %s",
+            provider_message_id,
+            extra=log_extra,
+        )
+        return provider_message_id
+
+    logger.warning(
+        "Message sent but no provider_message_id in response",
+        extra=log_extra,
+    )
+    return None
+
+
+def _log_send_error(e: Exception, log_extra: dict[str, Any]) -> None:
+    """Log a send that failed for good (after any retries)."""
+    if isinstance(e, _WhatsAppClientError):
+        # Expected outcome (not retried), the traceback adds nothing
+        logger.error(
+            "Client error sending message: %s - %s",
+            e.status,
+            e.text,
+            extra=log_extra,
+        )
+    elif isinstance(e, httpx.HTTPStatusError):
+        logger.error(
+            "Server error sending message: %s - %s",
+            e.response.status_code,
+            e.response.text,
+            extra=log_extra,
+            exc_info=True,
+        )
+    elif isinstance(e, (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)):
+        # These are retried by retry_with_backoff, but if all retries fail:
+        logger.error(
+            "Network error sending message after retries: %s",
+            e,
+            extra=log_extra,
+            exc_info=True,
+        )
+    else:
+        logger.error(
+            "Unexpected error sending message: %s", e, extra=log_extra, exc_info=True
+        )
+
+
+def send_text_message(
+    channel: Channel,
+    to_phone: str,
+    message_text: str,
+) -> str | None:
+    """Send a text message via WhatsApp Cloud API.
+
+    Args:
+        channel: Channel configuration
+        to_phone: Recipient phone number (E.164 format, e.g., +5511999999999)
+        message_text: Message text content
+
+    Returns:
+        Provider message ID if successful, None otherwise
+
+    Raises:
+        Exception: If message sending fails
+    """
+    url, headers, body, log_extra = _prepare_request(channel, to_phone, message_text)
+
     def _send():
         """Inner function for retry logic."""
-        with httpx.Client(timeout=settings.whatsapp_api_timeout) as client:
-            response = client.post(url, json=payload, headers=headers)
-            # Check for 5xx errors (retry) vs 4xx errors (don't retry)
-            if response.status_code >= 500:
-                # 5xx errors should be retried
-                response.raise_for_status()  # Raise to trigger retry
-            elif response.status_code >= 400:
-                # 4xx errors are client errors, don't retry - raise special exception
-                raise httpx.HTTPStatusError(
-                    f"Client error: {response.status_code}",
-                    request=response.request,
-                    response=response,
-                )
-            return response.json()
-    
-    # Retry on network errors and 5xx status codes only
-    # Don't retry on 4xx (client errors) - those are permanent
+        response = get_http_client().post(url, content=body, headers=headers)
+        return _parse_response(response)
+
     try:
         result = retry_with_backoff(
             _send,
             max_retries=3,
             initial_delay=1.0,
             max_delay=30.0,
-            retryable_exceptions=(
-                httpx.TimeoutException,
-                httpx.NetworkError,
-            ),
-        )
-        
-        provider_message_id = result.get("messages", [{}])[0].get("id")
-        
-        if provider_message_id:
-            log_extra["provider_message_id"] = provider_message_id
-            logger.info(
-                f"Message sent successfully: {provider_message_id}",
-                extra=log_extra,
-            )
-            return provider_message_id
-        else:
-            logger.warning(
-                "Message sent but no provider_message_id in response",
-                extra=log_extra,
-            )
-            return None
-            
-    except httpx.HTTPStatusError as e:
-        # Don't retry on 4xx errors (client errors)
-        if 400 <= e.response.status_code < 500:
-            logger.error(
-                f"Client error sending message: {e.response.status_code} - {e.response.text}",
-                extra=log_extra,
-            )
-            raise
-        # Retry on 5xx errors (server errors) - handled by retry logic
-        logger.error(
-            f"Server error sending message: {e.response.status_code} - {e.response.text}",
-            extra=log_extra,
+            retryable_exceptions=_RETRYABLE_EXCEPTIONS,
         )
+    except Exception as e:
+        _log_send_error(e, log_extra)
         raise
-    except (httpx.TimeoutException, httpx.NetworkError) as e:
-        # These are retried by retry_with_backoff, but if all retries fail:
-        logger.error(
-            f"Network error sending message after retries: {e}",
-            extra=log_extra,
-            exc_info=True,
+
+    return _extract_message_id(result, log_extra)
+
+
+async def send_text_message_async(
+    channel: Channel,
+    to_phone: str,
+    message_text: str,
+) -> str | None:
+    """Send a text message via WhatsApp Cloud API without blocking the event loop.
+
+    Same behaviour as send_text_message, so several sends can run concurrently
+    (e.g. with asyncio.gather) over the shared async client.
+
+    Args:
+        channel: Channel configuration
+        to_phone: Recipient phone number (E.164 format, e.g., +5511999999999)
+        message_text: Message text content
+
+    Returns:
+        Provider message ID if successful, None otherwise
+
+    Raises:
+        Exception: If message sending fails
+    """
+    url, headers, body, log_extra = _prepare_request(channel, to_phone, message_text)
+
+    async def _send():
+        """Inner coroutine for retry logic."""
+        response = await get_async_http_client().post(url, content=body, headers=headers)
+        return _parse_response(response)
+
+    try:
+        result = await retry_with_backoff_async(
+            _send,
+            max_retries=3,
+            initial_delay=1.0,
+            max_delay=30.0,
+            retryable_exceptions=_RETRYABLE_EXCEPTIONS,
         )
-        raise
     except Exception as e:
-        logger.error(f"Unexpected error sending message: {e}", extra=log_extra, exc_info=True)
+        _log_send_error(e, log_extra)
         raise
 
+    return _extract_message_id(result, log_extra)
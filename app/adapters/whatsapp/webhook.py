@@ -4,14 +4,19 @@ import logging
 from typing import Annotated, Any
 
 from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
-from app.adapters.whatsapp.models import WhatsAppWebhookPayload
+from app.adapters.whatsapp.models import WhatsAppMessage, WhatsAppWebhookPayload
 from app.db.base import SessionLocal
-from app.db.models import Message, MessageDirection
+from app.db.models import Channel, Message, MessageDirection
+from app.middleware.host_routing import HostContext
 from app.middleware.rate_limit import webhook_rate_limit
 from app.settings import settings
-from app.worker.jobs import enqueue_inbound_event
+from app.worker.jobs import enqueue_inbound_events, pending_inbound_events
 
 logger = logging.getLogger(__name__)
 
@@ -40,8 +45,6 @@ async def verify_webhook(
     Only accessible on API host.
     """
     # Check API host (webhooks should only be on API host)
-    from app.middleware.host_routing import HostContext
-
     if request.state.host_context != HostContext.API:
         raise HTTPException(status_code=404, detail="Webhook only available on API host")
     if (
@@ -60,7 +63,6 @@ async def verify_webhook(
 @webhook_rate_limit
 async def handle_webhook(
     request: Request,
-    payload: WhatsAppWebhookPayload,
     db: Annotated[Session, Depends(get_db)],
 ) -> dict[str, str]:
     """Handle incoming WhatsApp webhook (POST request).
@@ -70,141 +72,246 @@ async def handle_webhook(
     Returns 200 quickly (target <200ms) after enqueueing.
     """
     # Check API host (webhooks should only be on API host)
-    from app.middleware.host_routing import HostContext
-
     if request.state.host_context != HostContext.API:
         raise HTTPException(status_code=404, detail="Webhook only available on API host")
-    logger.info(f"Received webhook: object={payload.object}, entries={len(payload.entry)}")
+
+    # Validate straight from the raw body: pydantic-core parses the JSON itself,
+    # skipping the intermediate dict FastAPI would build with json.loads
+    try:
+        payload = WhatsAppWebhookPayload.model_validate_json(await request.body())
+    except ValidationError as e:
+        # Same 422 shape FastAPI produces for a declared body parameter
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+        ) from e
+
+    logger.info("Received webhook: object=%s, entries=%d", payload.object, len(payload.entry))
 
     try:
+        # Collect the messages first, so the whole batch needs one idempotency
+        # query and one channel query however many messages it carries
+        pending: list[tuple[WhatsAppMessage, Any, str | None]] = []
         for entry in payload.entry:
-            # entry.changes is a list of dicts from Pydantic
-            changes = entry.changes if isinstance(entry.changes, list) else []
-            for change in changes:
-                value = change.get("value", {}) if isinstance(change, dict) else {}
+            for change in entry.changes:
+                value = change.value
 
-                # Process messages
-                if "messages" in value and value["messages"]:
-                    for msg_data in value["messages"]:
-                        await _process_message(db, msg_data, value, entry)
+                # Collect messages with the phone_number_id they were sent to
+                if value.messages:
+                    phone_number_id = value.metadata.phone_number_id if value.metadata else None
+                    for msg_data in value.messages:
+                        msg = _parse_message(msg_data)
+                        if msg:
+                            pending.append((msg, msg_data, phone_number_id))
 
                 # Process status updates (acknowledge, but don't process)
-                statuses = value.get("statuses")
-                if statuses:
-                    logger.debug(f"Status update received: {statuses}")
+                if value.statuses:
+                    # Lazy args: the statuses list is only formatted if DEBUG is enabled
+                    logger.debug("Status update received: %s", value.statuses)
+
+        if pending:
+            await _process_messages(db, pending)
 
         return {"status": "ok"}
 
     except HTTPException:
         raise
     except ValueError as e:
-        logger.error(f"Invalid webhook payload: {e}", exc_info=True)
+        logger.error("Invalid webhook payload: %s", e, exc_info=True)
         raise HTTPException(status_code=400, detail=f"Invalid payload: {e}")
     except Exception as e:
-        logger.error(f"Error processing webhook: {e}", exc_info=True)
+        logger.error("Error processing webhook: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-async def _process_message(
-    db: Session,
-    msg_data: dict[str, Any],
-    value: dict[str, Any],
-    entry: dict[str, Any],
-) -> None:
-    """Process a single message from webhook.
+def _parse_message(msg_data: Any) -> WhatsAppMessage | None:
+    """Validate one webhook message; None (logged) if it is malformed or has no id."""
+    try:
+        msg = WhatsAppMessage.model_validate(msg_data)
+    except ValidationError as e:
+        logger.warning(
+            "Invalid message in webhook, skipping: %s",
+            e,
+            extra={"provider_message_id": None},
+        )
+        return None
 
-    Implements idempotency: checks if message already processed.
-    Includes structured logging with provider_message_id (R5).
-    """
-    provider_message_id = msg_data.get("id")
-    if not provider_message_id:
+    if not msg.id:
         logger.warning("Message missing id, skipping", extra={"provider_message_id": None})
-        return
-
-    # Structured logging with provider_message_id (R5)
-    log_extra = {"provider_message_id": provider_message_id}
+        return None
 
-    # Idempotency check: if message already exists, skip
-    existing = db.query(Message).filter_by(provider_message_id=provider_message_id).first()
-    if existing:
-        logger.info(
-            f"Message {provider_message_id} already processed, skipping (idempotent)",
-            extra=log_extra,
-        )
-        return
+    return msg
 
-    # Extract message data
-    from_phone = msg_data.get("from")
-    message_type = msg_data.get("type", "unknown")
-    text_content = None
-    if message_type == "text" and "text" in msg_data:
-        text_content = msg_data["text"].get("body", "")
 
-    # For MVP, we need tenant_id and channel_id from metadata
-    # In production, these would come from the webhook metadata or be determined by phone_number_id
-    # For now, we'll need to look up the channel by phone_number_id from metadata
-    metadata = value.get("metadata", {})
-    phone_number_id = metadata.get("phone_number_id")
-
-    if not phone_number_id:
-        logger.warning(
-            f"Missing phone_number_id in metadata, cannot process message {provider_message_id}",
-            extra=log_extra,
-        )
-        return
+async def _process_messages(
+    db: Session,
+    pending: list[tuple[WhatsAppMessage, Any, str | None]],
+) -> None:
+    """Process the messages from one webhook.
 
-    # Look up channel (for MVP, assume single tenant - will be enhanced later)
-    from app.db.models import Channel
+    Implements idempotency: messages already stored are skipped by the INSERT
+    itself (ON CONFLICT on provider_message_id), which is also race-safe.
+    A redelivered message that is stored but was never processed (e.g. the
+    enqueue failed after the commit) is enqueued again, so Meta's retry
+    recovers it.
+    Includes structured logging with provider_message_id (R5).
 
-    channel = db.query(Channel).filter_by(phone_number_id=phone_number_id, is_active=True).first()
-    if not channel:
-        logger.warning(
-            f"Channel not found for phone_number_id={phone_number_id}, message {provider_message_id}",
-            extra=log_extra,
-        )
+    Args:
+        db: Database session
+        pending: (message, message as received, phone_number_id from the change
+            metadata) triples
+    """
+    phone_number_ids = {phone_number_id for _, _, phone_number_id in pending} - {None}
+
+    # Look up channels (for MVP, assume single tenant - will be enhanced later)
+    channels_by_phone_number_id: dict[str, Channel] = {}
+    if phone_number_ids:
+        channels_by_phone_number_id = {
+            channel.phone_number_id: channel
+            for channel in db.query(Channel).filter(
+                Channel.phone_number_id.in_(phone_number_ids),
+                Channel.is_active.is_(True),
+            )
+        }
+
+    # (row, channel_id, sender phone); ids are kept as plain values so nothing
+    # has to be reloaded after the commit expires the session
+    new_messages: list[tuple[dict[str, Any], str, str | None]] = []
+    seen_ids: set[str] = set()
+    for msg, msg_data, phone_number_id in pending:
+        provider_message_id = msg.id
+
+        # Structured logging with provider_message_id (R5)
+        log_extra = {"provider_message_id": provider_message_id}
+
+        # Repeated within this batch
+        if provider_message_id in seen_ids:
+            logger.info(
+                "Message %s already processed, skipping (idempotent)",
+                provider_message_id,
+                extra=log_extra,
+            )
+            continue
+
+        # For MVP, tenant_id and channel_id come from the channel registered for
+        # the phone_number_id in the webhook metadata
+        if not phone_number_id:
+            logger.warning(
+                "Missing phone_number_id in metadata, cannot process message %s",
+                provider_message_id,
+                extra=log_extra,
+            )
+            continue
+
+        channel = channels_by_phone_number_id.get(phone_number_id)
+        if not channel:
+            logger.warning(
+                "Channel not found for phone_number_id=%s, message %s",
+                phone_number_id,
+                provider_message_id,
+                extra=log_extra,
+            )
+            continue
+
+        # Extract message data
+        text_content = msg.text.body if msg.type == "text" and msg.text else None
+
+        # Persist message (conversation_id will be set by worker)
+        message = {
+            "tenant_id": channel.tenant_id,
+            "conversation_id": None,  # Will be set by worker when conversation is created/updated
+            "provider_message_id": provider_message_id,
+            "direction": MessageDirection.INBOUND,
+            "message_type": msg.type,
+            "raw_payload": msg_data,
+            "text_content": text_content,
+        }
+        seen_ids.add(provider_message_id)
+        new_messages.append((message, str(channel.id), msg.from_))
+
+    if not new_messages:
         return
 
-    tenant_id = channel.tenant_id
-    channel_id = channel.id
-
-    # Persist message (conversation_id will be set by worker)
-    message = Message(
-        tenant_id=tenant_id,
-        conversation_id=None,  # Will be set by worker when conversation is created/updated
-        provider_message_id=provider_message_id,
-        direction=MessageDirection.INBOUND,
-        message_type=message_type,
-        raw_payload=msg_data,
-        text_content=text_content,
-    )
-
+    # Bulk INSERT ... ON CONFLICT DO NOTHING: only the rows actually inserted
+    # come back, the others were already processed
     try:
-        db.add(message)
+        inserted_ids = set(
+            db.scalars(
+                insert(Message)
+                .on_conflict_do_nothing(index_elements=["provider_message_id"])
+                .returning(Message.provider_message_id),
+                [message for message, _, _ in new_messages],
+            )
+        )
         db.commit()
-        logger.info(f"Message {provider_message_id} persisted", extra=log_extra)
+        logger.info("%d message(s) persisted", len(inserted_ids))
     except Exception as e:
         db.rollback()
-        logger.error(f"Error persisting message {provider_message_id}: {e}", extra=log_extra)
+        logger.error("Error persisting %d message(s): %s", len(new_messages), e)
         raise
 
-    # Enqueue job for worker
-    try:
-        enqueue_inbound_event(
-            tenant_id=str(tenant_id),
-            provider_message_id=provider_message_id,
-            contact_phone=from_phone or "",
-            message_text=text_content or "",
-            raw_payload=msg_data,
-            channel_id=str(channel_id),
+    # Already stored: only worth another job if the worker never got to it
+    # (conversation_id is set once processed) and no job for it is pending
+    redelivered_ids = {message["provider_message_id"] for message, _, _ in new_messages}
+    redelivered_ids -= inserted_ids
+    unprocessed_ids: set[str] = set()
+    if redelivered_ids:
+        unprocessed_ids = set(
+            db.scalars(
+                select(Message.provider_message_id).where(
+                    Message.provider_message_id.in_(redelivered_ids),
+                    Message.conversation_id.is_(None),
+                )
+            )
+        )
+        if unprocessed_ids:
+            unprocessed_ids -= pending_inbound_events(unprocessed_ids)
+
+    # Enqueue jobs for worker, all in one Redis round trip
+    events: list[dict[str, Any]] = []
+    for message, channel_id, from_phone in new_messages:
+        provider_message_id = message["provider_message_id"]
+        log_extra = {"provider_message_id": provider_message_id}
+        if provider_message_id in unprocessed_ids:
+            logger.info(
+                "Message %s stored but not processed, enqueueing again",
+                provider_message_id,
+                extra=log_extra,
+            )
+        elif provider_message_id not in inserted_ids:
+            logger.info(
+                "Message %s already received, skipping (idempotent)",
+                provider_message_id,
+                extra=log_extra,
+            )
+            continue
+        events.append(
+            {
+                "tenant_id": str(message["tenant_id"]),
+                "provider_message_id": provider_message_id,
+                "contact_phone": from_phone or "",
+                "message_text": message["text_content"] or "",
+                "raw_payload": message["raw_payload"],
+                "channel_id": channel_id,
+            }
         )
-        logger.info(f"Message {provider_message_id} enqueued for processing", extra=log_extra)
+    if not events:
+        return
+
+    try:
+        enqueue_inbound_events(events)
     except Exception as e:
-        # Log error but don't fail - message is already persisted
+        # Log error but don't fail - messages are already persisted
         # Worker can retry or we can have a separate retry mechanism
         logger.error(
-            f"Error enqueueing message {provider_message_id}: {e}. Message persisted but not queued.",
-            extra=log_extra,
+            "Error enqueueing %d message(s): %s. Messages persisted but not queued.",
+            len(events),
+            e,
         )
         # Re-raise to allow caller to handle
         raise
-
+    for event in events:
+        logger.info(
+            "Message %s enqueued for processing",
+            event["provider_message_id"],
+            extra={"provider_message_id": event["provider_message_id"]},
+        )
@@ -1,26 +1,31 @@
 """Admin authentication."""
 
 import logging
+from functools import cache
 from typing import Annotated
 from uuid import UUID
 
+import bcrypt
 from fastapi import Depends, HTTPException, Request, status
-from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 
-from app.core.sessions import create_session, delete_session, get_session
+# create_session and delete_session are re-exported for app.admin.routes
+from app.core.sessions import create_session, delete_session, get_session  # noqa: F401
 from app.db.base import SessionLocal
 from app.db.models import User
+from app.settings import settings
 
 logger = logging.getLogger(__name__)
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+    except ValueError:
+        # Malformed hash, or a password over bcrypt's 72-byte limit (which
+        # get_password_hash never accepted)
+        return False
 
 
 def get_password_hash(password: str) -> str:
@@ -35,7 +40,23 @@ def get_password_hash(password: str) -> str:
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="A senha é muito longa. Por favor, use uma senha com no máximo 72 caracteres.",
         )
-    return pwd_context.hash(password)
+    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
+    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+
+
+@cache
+def _dummy_hash() -> str:
+    """Hash checked against when the user doesn't exist (computed once)."""
+    return get_password_hash("dummy-password")
+
+
+def verify_unknown_user_password(password: str) -> None:
+    """Spend the same bcrypt work as checking a wrong password.
+
+    Called when the login email doesn't exist, so the response time doesn't
+    reveal whether the email is registered.
+    """
+    verify_password(password, _dummy_hash())
 
 
 def get_db() -> Session:
@@ -71,7 +92,7 @@ async def get_current_user(
         )
 
     user_id = UUID(session_data["user_id"])
-    user = db.query(User).filter_by(id=user_id).first()
+    user = db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -81,11 +102,6 @@ async def get_current_user(
     return user
 
 
-# Session functions are now in app.core.sessions
-# Re-export for backward compatibility
-from app.core.sessions import create_session, delete_session
-
-
 def authenticate_user(db: Session, email: str, password: str, tenant_id: UUID) -> User | None:
     """Authenticate a user."""
     user = (
@@ -95,6 +111,7 @@ def authenticate_user(db: Session, email: str, password: str, tenant_id: UUID) -
     )
 
     if not user:
+        verify_unknown_user_password(password)
         return None
 
     if not verify_password(password, user.password_hash):
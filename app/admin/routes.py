@@ -7,18 +7,16 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, Form, HTTPException, Request, status
 from fastapi.responses import HTMLResponse, RedirectResponse
-from jinja2 import Environment, select_autoescape
-from sqlalchemy.orm import Session
-
-# Create safe Jinja2 environment with autoescape enabled
-_jinja_env = Environment(autoescape=select_autoescape(['html', 'xml']))
+from jinja2 import DictLoader, Environment, select_autoescape
+from sqlalchemy.orm import Session, load_only
 
 from app.admin.auth import authenticate_user, create_session, delete_session, get_current_user, get_db
-from app.adapters.whatsapp.sender import send_text_message
+from app.adapters.whatsapp.sender import WHATSAPP_WINDOW, send_text_message_async
 from app.core.csrf import require_csrf_token
 from app.db.models import (
     Approval,
     ApprovalStatus,
+    AuditLog,
     Channel,
     Contact,
     Conversation,
@@ -27,6 +25,7 @@ from app.db.models import (
     MessageDirection,
     Quote,
     QuoteStatus,
+    Tenant,
     User,
 )
 from app.domain.messages import format_quote_message
@@ -38,13 +37,9 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 
 
 # Simple template rendering (for MVP)
-# In production, use proper Jinja2 environment with file templates
-def render_template(template_name: str, context: dict) -> str:
-    """Render a template (simplified for MVP)."""
-    # For MVP, we'll use simple string templates
-    # In production, load from files
-    templates = {
-        "login.html": """
+# In production, load from files
+_TEMPLATES = {
+    "login.html": """
 <!DOCTYPE html>
 <html>
 <head>
@@ -71,7 +66,7 @@ def render_template(template_name: str, context: dict) -> str:
 </body>
 </html>
 """,
-        "approvals.html": """
+    "approvals.html": """
 <!DOCTYPE html>
 <html>
 <head>
@@ -126,11 +121,51 @@ def render_template(template_name: str, context: dict) -> str:
 </body>
 </html>
 """,
-    }
+}
+
+# Create safe Jinja2 environment with autoescape enabled. The templates never
+# change at runtime, so there is no need to check them for reloads
+_jinja_env = Environment(
+    loader=DictLoader(_TEMPLATES),
+    autoescape=select_autoescape(['html', 'xml']),
+    auto_reload=False,
+)
+
+# Compiled once at import, so rendering only runs the generated code
+_COMPILED_TEMPLATES = {name: _jinja_env.get_template(name) for name in _TEMPLATES}
+_NOT_FOUND = _jinja_env.from_string("<p>Template not found</p>")
+
+
+def render_template(template_name: str, context: dict) -> str:
+    """Render a template (simplified for MVP)."""
+    return _COMPILED_TEMPLATES.get(template_name, _NOT_FOUND).render(**context)
+
+
+# HTMX fragments that replace an approval's table row after a decision
+_APPROVED_ROW = '<tr><td colspan="6" style="background: #d4edda;">Quote %s approved and sent</td></tr>'
+_REJECTED_ROW = '<tr><td colspan="6" style="background: #f8d7da;">Quote %s rejected</td></tr>'
+_ALREADY_DECIDED_ROW = '<tr><td colspan="6">Approval already %s</td></tr>'
+
+
+# Tenant used for admin logins (single-tenant MVP), looked up on first login
+_default_tenant_id: UUID | None = None
+
+
+def _get_default_tenant_id(db: Session) -> UUID | None:
+    """Get the ID of the tenant admin logins belong to (cached once found).
 
-    template_str = templates.get(template_name, "<p>Template not found</p>")
-    template = _jinja_env.from_string(template_str)
-    return template.render(**context)
+    This is the oldest tenant, so the choice is stable as tenants are added.
+    """
+    global _default_tenant_id
+    if _default_tenant_id is None:
+        _default_tenant_id = db.query(Tenant.id).order_by(Tenant.created_at).limit(1).scalar()
+    return _default_tenant_id
+
+
+def invalidate_default_tenant_id() -> None:
+    """Forget the cached default tenant, e.g. after it was deleted or replaced."""
+    global _default_tenant_id
+    _default_tenant_id = None
 
 
 @router.get("/login", response_class=HTMLResponse)
@@ -149,16 +184,14 @@ async def login(
     """Handle login."""
     # For MVP, assume single tenant (tenant_id from first tenant)
     # In production, tenant selection would be part of login
-    from app.db.models import Tenant
-
-    tenant = db.query(Tenant).first()
-    if not tenant:
+    tenant_id = _get_default_tenant_id(db)
+    if not tenant_id:
         return HTMLResponse(
             render_template("login.html", {"error": "No tenant configured"}),
             status_code=status.HTTP_400_BAD_REQUEST,
         )
 
-    user = authenticate_user(db, email, password, tenant.id)
+    user = authenticate_user(db, email, password, tenant_id)
     if not user:
         return HTMLResponse(
             render_template("login.html", {"error": "Invalid email or password"}),
@@ -214,40 +247,60 @@ async def approvals_list(
     db: Annotated[Session, Depends(get_db)],
 ) -> str:
     """List pending approvals."""
-    # Get pending approvals for user's tenant
-    approvals = (
-        db.query(Approval)
-        .filter_by(tenant_id=user.tenant_id, status=ApprovalStatus.PENDING)
+    # Get pending approvals for user's tenant with their quote and contact
+    # phone in one query (the contact may be missing, the quote may not)
+    rows = (
+        db.query(Approval, Quote, Contact.phone)
+        .join(Quote, Quote.id == Approval.quote_id)
+        .outerjoin(Conversation, Conversation.id == Quote.conversation_id)
+        .outerjoin(Contact, Contact.id == Conversation.contact_id)
+        .filter(
+            Approval.tenant_id == user.tenant_id,
+            Approval.status == ApprovalStatus.PENDING,
+        )
         .order_by(Approval.created_at.desc())
         .all()
     )
 
-    # Enrich with quote and contact info
-    approvals_data = []
-    for approval in approvals:
-        quote = db.query(Quote).filter_by(id=approval.quote_id).first()
-        if not quote:
-            continue
-
-        conversation = (
-            db.query(Conversation).filter_by(id=quote.conversation_id).first()
-        )
-        contact = None
-        if conversation:
-            contact = db.query(Contact).filter_by(id=conversation.contact_id).first()
-
-        approvals_data.append({
+    approvals_data = [
+        {
             "id": str(approval.id),
             "quote_id": str(quote.id),
-            "contact_phone": contact.phone if contact else "Unknown",
+            "contact_phone": contact_phone or "Unknown",
             "total": float(quote.total),
             "reason": approval.reason or "N/A",
             "created_at": approval.created_at,
-        })
+        }
+        for approval, quote, contact_phone in rows
+    ]
 
     return render_template("approvals.html", {"approvals": approvals_data})
 
 
+def _load_approval(
+    db: Session, approval_id: UUID, tenant_id: UUID
+) -> tuple[Approval, Quote | None, Conversation | None, str | None, Channel | None] | None:
+    """Load an approval with its quote, conversation, contact phone and channel in one query.
+
+    Outer joins, so a missing row comes back as None instead of dropping the
+    approval. The channel must belong to the same tenant, and only the columns
+    the sender needs are loaded for it.
+    """
+    return (
+        db.query(Approval, Quote, Conversation, Contact.phone, Channel)
+        .options(load_only(Channel.id, Channel.tenant_id, Channel.phone_number_id))
+        .outerjoin(Quote, Quote.id == Approval.quote_id)
+        .outerjoin(Conversation, Conversation.id == Quote.conversation_id)
+        .outerjoin(Contact, Contact.id == Conversation.contact_id)
+        .outerjoin(
+            Channel,
+            (Channel.id == Conversation.channel_id) & (Channel.tenant_id == tenant_id),
+        )
+        .filter(Approval.id == approval_id, Approval.tenant_id == tenant_id)
+        .first()
+    )
+
+
 @router.post("/approvals/{approval_id}/approve", response_class=HTMLResponse)
 async def approve_quote(
     request: Request,
@@ -263,26 +316,23 @@ async def approve_quote(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid approval ID format")
 
-    approval = db.query(Approval).filter_by(id=approval_uuid, tenant_id=user.tenant_id).first()
-    if not approval:
+    row = _load_approval(db, approval_uuid, user.tenant_id)
+    if not row:
         raise HTTPException(status_code=404, detail="Approval not found")
+    approval, quote, conversation, contact_phone, channel = row
 
     if approval.status != ApprovalStatus.PENDING:
-        return f'<tr><td colspan="6">Approval already {approval.status}</td></tr>'
+        return _ALREADY_DECIDED_ROW % approval.status
 
-    quote = db.query(Quote).filter_by(id=approval.quote_id).first()
     if not quote:
         raise HTTPException(status_code=404, detail="Quote not found")
 
-    conversation = db.query(Conversation).filter_by(id=quote.conversation_id).first()
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
-    contact = db.query(Contact).filter_by(id=conversation.contact_id).first()
-    if not contact:
+    if not contact_phone:
         raise HTTPException(status_code=404, detail="Contact not found")
 
-    channel = db.query(Channel).filter_by(id=conversation.channel_id, tenant_id=user.tenant_id).first()
     if not channel:
         raise HTTPException(status_code=404, detail="Channel not found")
 
@@ -305,9 +355,9 @@ async def approve_quote(
 
         # Send message BEFORE any DB changes
         try:
-            provider_msg_id = send_text_message(
+            provider_msg_id = await send_text_message_async(
                 channel=channel,
-                to_phone=contact.phone,
+                to_phone=contact_phone,
                 message_text=quote_text,
             )
         except Exception as send_error:
@@ -326,10 +376,13 @@ async def approve_quote(
             raise HTTPException(status_code=500, detail="Failed to send quote message (returned None)")
 
         # Only update DB if message was sent successfully
+        # One timestamp for the approval and the window it opens
+        now = datetime.now(timezone.utc)
+
         # Update approval
         approval.status = ApprovalStatus.APPROVED
         approval.approved_by_user_id = user.id
-        approval.approved_at = datetime.now(timezone.utc)
+        approval.approved_at = now
 
         # Transition conversation state
         new_state = transition(conversation.state, Event.ADMIN_APPROVED)
@@ -351,11 +404,9 @@ async def approve_quote(
         quote.status = QuoteStatus.SENT
 
         # Update window expiration
-        from datetime import timedelta
-        conversation.window_expires_at = datetime.now(timezone.utc) + timedelta(hours=24)
+        conversation.window_expires_at = now + WHATSAPP_WINDOW
 
         # Create audit log entry
-        from app.db.models import AuditLog
         audit_log = AuditLog(
             tenant_id=user.tenant_id,
             entity_type="approval",
@@ -367,14 +418,21 @@ async def approve_quote(
         db.add(audit_log)
 
         # Commit everything
+        # Read before commit: the commit expires the objects, and reading them
+        # afterwards would reload each one with a SELECT
+        log_extra = {
+            "approval_id": str(approval.id),
+            "quote_id": str(quote.id),
+            "user_id": str(user.id),
+        }
         db.commit()
 
         logger.info(
-            f"Quote {quote.id} approved and sent by user {user.id}",
-            extra={"approval_id": str(approval.id), "quote_id": str(quote.id), "user_id": str(user.id)},
+            f"Quote {log_extra['quote_id']} approved and sent by user {log_extra['user_id']}",
+            extra=log_extra,
         )
 
-        return f'<tr><td colspan="6" style="background: #d4edda;">Quote {quote.id} approved and sent</td></tr>'
+        return _APPROVED_ROW % log_extra["quote_id"]
 
     except Exception as e:
         db.rollback()
@@ -397,18 +455,17 @@ async def reject_quote(
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid approval ID format")
 
-    approval = db.query(Approval).filter_by(id=approval_uuid, tenant_id=user.tenant_id).first()
-    if not approval:
+    row = _load_approval(db, approval_uuid, user.tenant_id)
+    if not row:
         raise HTTPException(status_code=404, detail="Approval not found")
+    approval, quote, conversation, _contact_phone, _channel = row
 
     if approval.status != ApprovalStatus.PENDING:
-        return f'<tr><td colspan="6">Approval already {approval.status}</td></tr>'
+        return _ALREADY_DECIDED_ROW % approval.status
 
-    quote = db.query(Quote).filter_by(id=approval.quote_id).first()
     if not quote:
         raise HTTPException(status_code=404, detail="Quote not found")
 
-    conversation = db.query(Conversation).filter_by(id=quote.conversation_id).first()
     if not conversation:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
@@ -426,7 +483,6 @@ async def reject_quote(
         quote.status = QuoteStatus.LOST
 
         # Create audit log entry
-        from app.db.models import AuditLog
         audit_log = AuditLog(
             tenant_id=user.tenant_id,
             entity_type="approval",
@@ -437,14 +493,21 @@ async def reject_quote(
         )
         db.add(audit_log)
 
+        # Read before commit: the commit expires the objects, and reading them
+        # afterwards would reload each one with a SELECT
+        log_extra = {
+            "approval_id": str(approval.id),
+            "quote_id": str(quote.id),
+            "user_id": str(user.id),
+        }
         db.commit()
 
         logger.info(
-            f"Quote {quote.id} rejected by user {user.id}",
-            extra={"approval_id": str(approval.id), "quote_id": str(quote.id), "user_id": str(user.id)},
+            f"Quote {log_extra['quote_id']} rejected by user {log_extra['user_id']}",
+            extra=log_extra,
         )
 
-        return f'<tr><td colspan="6" style="background: #f8d7da;">Quote {quote.id} rejected</td></tr>'
+        return _REJECTED_ROW % log_extra["quote_id"]
 
     except Exception as e:
         db.rollback()
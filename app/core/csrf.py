@@ -46,7 +46,9 @@ def validate_csrf_token(request: Request, token: Optional[str] = None) -> None:
             detail="CSRF token missing",
         )
     
-    if not secrets.compare_digest(token, stored_token):
+    # Compared as bytes: compare_digest rejects str with non-ASCII characters
+    # (TypeError, i.e. a 500) and a client controls both values
+    if not secrets.compare_digest(token.encode(), stored_token.encode()):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="CSRF token invalid",
@@ -54,7 +54,7 @@ def get_current_user(
             detail="Invalid session",
         )
 
-    user = db.query(User).filter_by(id=user_id).first()
+    user = db.get(User, user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
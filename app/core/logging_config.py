@@ -1,12 +1,24 @@
 """Structured logging configuration."""
 
-import json
 import logging
 import sys
 from typing import Any
 
+import orjson
+
 from app.settings import settings
 
+# Standard LogRecord attributes, left out of the extra fields
+_RECORD_ATTRS = frozenset({
+    "name", "msg", "args", "created", "filename", "funcName",
+    "levelname", "levelno", "lineno", "module", "msecs",
+    "message", "pathname", "process", "processName", "relativeCreated",
+    "thread", "threadName", "taskName", "exc_info", "exc_text", "stack_info",
+})
+
+# Extra fields converted to str (usually UUIDs)
+_STR_FIELDS = frozenset({"tenant_id", "user_id", "channel_id"})
+
 
 class JSONFormatter(logging.Formatter):
     """JSON formatter for structured logging."""
@@ -23,34 +35,20 @@ class JSONFormatter(logging.Formatter):
             "line": record.lineno,
         }
         
-        # Add exception info if present
+        # Add exception info if present, formatting the traceback only once per
+        # record (cached on exc_text, as logging.Formatter does)
         if record.exc_info:
-            log_data["exception"] = self.formatException(record.exc_info)
-        
-        # Add extra fields from log record
-        if hasattr(record, "request_id"):
-            log_data["request_id"] = record.request_id
-        if hasattr(record, "tenant_id"):
-            log_data["tenant_id"] = str(record.tenant_id)
-        if hasattr(record, "user_id"):
-            log_data["user_id"] = str(record.user_id)
-        if hasattr(record, "channel_id"):
-            log_data["channel_id"] = str(record.channel_id)
-        if hasattr(record, "provider_message_id"):
-            log_data["provider_message_id"] = record.provider_message_id
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+            log_data["exception"] = record.exc_text
         
-        # Add any other extra fields
+        # Add extra fields from log record (ids are logged as strings)
         for key, value in record.__dict__.items():
-            if key not in [
-                "name", "msg", "args", "created", "filename", "funcName",
-                "levelname", "levelno", "lineno", "module", "msecs",
-                "message", "pathname", "process", "processName", "relativeCreated",
-                "thread", "threadName", "exc_info", "exc_text", "stack_info",
-                "request_id", "tenant_id", "user_id", "channel_id", "provider_message_id",
-            ]:
-                log_data[key] = value
+            if key not in _RECORD_ATTRS:
+                log_data[key] = str(value) if key in _STR_FIELDS else value
         
-        return json.dumps(log_data, default=str)
+        # orjson handles datetime/UUID natively; anything else falls back to str
+        return orjson.dumps(log_data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
 
 
 def setup_logging():
@@ -2,32 +2,27 @@
 
 from jinja2 import Environment, select_autoescape
 
+from app.core.static import static_url
+
 # Create safe Jinja2 environment with autoescape enabled
 _jinja_env = Environment(autoescape=select_autoescape(['html', 'xml']))
+# Shared stylesheet/script (cached by the browser across steps)
+_jinja_env.globals.update(
+    onboarding_css=static_url("onboarding.css"),
+    onboarding_js=static_url("onboarding.js"),
+)
 
 
-def render_onboarding_step(step: int, context: dict) -> str:
-    """Render onboarding step template."""
-    templates = {
-        1: """
+_TEMPLATES = {
+    1: """
 <!DOCTYPE html>
 <html>
 <head>
     <title>Onboarding - Passo 1: Informações da Loja</title>
     <meta charset="utf-8">
-    <style>
-        body { font-family: Arial, sans-serif; max-width: 600px; margin: 50px auto; padding: 20px; }
-        h1 { color: #007bff; }
-        form { display: flex; flex-direction: column; gap: 15px; }
-        input, textarea { padding: 10px; border: 1px solid #ddd; border-radius: 4px; }
-        button { padding: 12px; background: #007bff; color: white; border: none; border-radius: 4px; cursor: pointer; }
-        .error { color: red; }
-        .progress { margin: 20px 0; }
-        .progress-bar { background: #e9ecef; height: 20px; border-radius: 10px; overflow: hidden; }
-        .progress-fill { background: #007bff; height: 100%; width: 20%; }
-    </style>
+    <link rel="stylesheet" href="{{ onboarding_css }}">
 </head>
-<body>
+<body class="step-1">
     <h1>Passo 1: Informações da Loja</h1>
     <div class="progress">
         <div class="progress-bar"><div class="progress-fill"></div></div>
@@ -49,26 +44,15 @@ def render_onboarding_step(step: int, context: dict) -> str:
 </body>
 </html>
 """,
-        2: """
+    2: """
 <!DOCTYPE html>
 <html>
 <head>
     <title>Onboarding - Passo 2: Regras de Frete</title>
     <meta charset="utf-8">
-    <style>
-        body { font-family: Arial, sans-serif; max-width: 700px; margin: 50px auto; padding: 20px; }
-        h1 { color: #007bff; }
-        form { display: flex; flex-direction: column; gap: 15px; }
-        .rule-group { border: 1px solid #ddd; padding: 15px; margin: 10px 0; border-radius: 4px; }
-        input { padding: 8px; border: 1px solid #ddd; border-radius: 4px; }
-        button { padding: 12px; background: #007bff; color: white; border: none; border-radius: 4px; cursor: pointer; }
-        .add-rule { background: #28a745; margin-top: 10px; }
-        .progress { margin: 20px 0; }
-        .progress-bar { background: #e9ecef; height: 20px; border-radius: 10px; overflow: hidden; }
-        .progress-fill { background: #007bff; height: 100%; width: 40%; }
-    </style>
+    <link rel="stylesheet" href="{{ onboarding_css }}">
 </head>
-<body>
+<body class="step-2">
     <h1>Passo 2: Regras de Frete</h1>
     <div class="progress">
         <div class="progress-bar"><div class="progress-fill"></div></div>
@@ -87,46 +71,19 @@ def render_onboarding_step(step: int, context: dict) -> str:
         <button type="button" class="add-rule" onclick="addRule()">+ Adicionar Regra</button>
         <button type="submit">Continuar</button>
     </form>
-    <script>
-        let ruleCount = 1;
-        function addRule() {
-            const form = document.querySelector('form');
-            const ruleGroup = document.createElement('div');
-            ruleGroup.className = 'rule-group';
-            ruleGroup.innerHTML = `
-                <h3>Regra de Frete ${ruleCount + 1}</h3>
-                <input type="text" name="bairro_${ruleCount}" placeholder="Bairro (opcional)">
-                <input type="text" name="cep_start_${ruleCount}" placeholder="CEP Inicial (opcional)">
-                <input type="text" name="cep_end_${ruleCount}" placeholder="CEP Final (opcional)">
-                <input type="number" name="base_freight_${ruleCount}" placeholder="Frete Base (R$)" step="0.01" min="0" required>
-                <input type="number" name="per_kg_${ruleCount}" placeholder="Por kg adicional (R$, opcional)" step="0.01" min="0">
-            `;
-            form.insertBefore(ruleGroup, form.querySelector('.add-rule'));
-            ruleCount++;
-        }
-    </script>
+    <script src="{{ onboarding_js }}"></script>
 </body>
 </html>
 """,
-        3: """
+    3: """
 <!DOCTYPE html>
 <html>
 <head>
     <title>Onboarding - Passo 3: Regras de Preço</title>
     <meta charset="utf-8">
-    <style>
-        body { font-family: Arial, sans-serif; max-width: 600px; margin: 50px auto; padding: 20px; }
-        h1 { color: #007bff; }
-        form { display: flex; flex-direction: column; gap: 15px; }
-        input { padding: 10px; border: 1px solid #ddd; border-radius: 4px; }
-        button { padding: 12px; background: #007bff; color: white; border: none; border-radius: 4px; cursor: pointer; }
-        .progress { margin: 20px 0; }
-        .progress-bar { background: #e9ecef; height: 20px; border-radius: 10px; overflow: hidden; }
-        .progress-fill { background: #007bff; height: 100%; width: 60%; }
-        .help-text { color: #6c757d; font-size: 0.9em; }
-    </style>
+    <link rel="stylesheet" href="{{ onboarding_css }}">
 </head>
-<body>
+<body class="step-3">
     <h1>Passo 3: Regras de Preço</h1>
     <div class="progress">
         <div class="progress-bar"><div class="progress-fill"></div></div>
@@ -158,26 +115,15 @@ def render_onboarding_step(step: int, context: dict) -> str:
 </body>
 </html>
 """,
-        4: """
+    4: """
 <!DOCTYPE html>
 <html>
 <head>
     <title>Onboarding - Passo 4: Itens Principais</title>
     <meta charset="utf-8">
-    <style>
-        body { font-family: Arial, sans-serif; max-width: 700px; margin: 50px auto; padding: 20px; }
-        h1 { color: #007bff; }
-        form { display: flex; flex-direction: column; gap: 15px; }
-        textarea { padding: 10px; border: 1px solid #ddd; border-radius: 4px; min-height: 200px; }
-        button { padding: 12px; background: #007bff; color: white; border: none; border-radius: 4px; cursor: pointer; }
-        .progress { margin: 20px 0; }
-        .progress-bar { background: #e9ecef; height: 20px; border-radius: 10px; overflow: hidden; }
-        .progress-fill { background: #007bff; height: 100%; width: 80%; }
-        .help-text { color: #6c757d; font-size: 0.9em; margin-top: 5px; }
-        .example { background: #f8f9fa; padding: 10px; border-radius: 4px; margin: 10px 0; }
-    </style>
+    <link rel="stylesheet" href="{{ onboarding_css }}">
 </head>
-<body>
+<body class="step-4">
     <h1>Passo 4: Itens Principais</h1>
     <div class="progress">
         <div class="progress-bar"><div class="progress-fill"></div></div>
@@ -207,26 +153,15 @@ XYZ789,Tijolo Cerâmico,un,0.85"></textarea>
 </body>
 </html>
 """,
-        5: """
+    5: """
 <!DOCTYPE html>
 <html>
 <head>
     <title>Onboarding - Passo 5: Conectar WhatsApp</title>
     <meta charset="utf-8">
-    <style>
-        body { font-family: Arial, sans-serif; max-width: 700px; margin: 50px auto; padding: 20px; }
-        h1 { color: #007bff; }
-        .warning { background: #fff3cd; border: 1px solid #ffc107; padding: 15px; margin: 20px 0; border-radius: 5px; }
-        .warning strong { color: #856404; }
-        .info { background: #d1ecf1; border: 1px solid #bee5eb; padding: 15px; margin: 20px 0; border-radius: 5px; }
-        .progress { margin: 20px 0; }
-        .progress-bar { background: #e9ecef; height: 20px; border-radius: 10px; overflow: hidden; }
-        .progress-fill { background: #007bff; height: 100%; width: 100%; }
-        ol { line-height: 1.8; }
-        button { padding: 12px 24px; background: #28a745; color: white; border: none; border-radius: 4px; cursor: pointer; font-size: 1.1em; }
-    </style>
+    <link rel="stylesheet" href="{{ onboarding_css }}">
 </head>
-<body>
+<body class="step-5">
     <h1>Passo 5: Conectar WhatsApp</h1>
     <div class="progress">
         <div class="progress-bar"><div class="progress-fill"></div></div>
@@ -275,12 +210,29 @@ XYZ789,Tijolo Cerâmico,un,0.85"></textarea>
 </body>
 </html>
 """,
-    }
+}
+
+# Compiled once at import, so rendering only runs the generated code
+_COMPILED_TEMPLATES = {
+    step: _jinja_env.from_string(source) for step, source in _TEMPLATES.items()
+}
+_NOT_FOUND = _jinja_env.from_string("<p>Step not found</p>")
 
-    template_str = templates.get(step, "<p>Step not found</p>")
-    template = _jinja_env.from_string(template_str)
-    return template.render(**context)
+
+def render_onboarding_step(step: int, context: dict) -> str:
+    """Render onboarding step template."""
+    return _COMPILED_TEMPLATES.get(step, _NOT_FOUND).render(**context)
 
 
+# The plain GET of a step has no context, so its page never changes: rendered
+# and encoded once at import
+_RENDERED_STEPS = {
+    step: template.render().encode("utf-8") for step, template in _COMPILED_TEMPLATES.items()
+}
 
 
+def render_onboarding_step_bytes(step: int, context: dict) -> bytes:
+    """Render onboarding step template as UTF-8 (prerendered when context is empty)."""
+    if not context and step in _RENDERED_STEPS:
+        return _RENDERED_STEPS[step]
+    return render_onboarding_step(step, context).encode("utf-8")
@@ -1,15 +1,21 @@
 """Operator authentication for internal admin."""
 
 import base64
+import hmac
 import os
 from typing import Optional
 
-from fastapi import HTTPException, Request, status
+from fastapi import Depends, HTTPException, Request, status
+
+from app.middleware.host_routing import HostContext
 
 # Operator credentials from environment
 OPERATOR_USERNAME = os.getenv("OPERATOR_USERNAME", "")
 OPERATOR_PASSWORD = os.getenv("OPERATOR_PASSWORD", "")
 
+# Decoded Basic Auth payload ("username:password") the header must carry
+_EXPECTED_CREDENTIALS = f"{OPERATOR_USERNAME}:{OPERATOR_PASSWORD}".encode()
+
 
 def verify_operator_auth(request: Request) -> bool:
     """Verify operator Basic Auth credentials.
@@ -37,14 +43,13 @@ def verify_operator_auth(request: Request) -> bool:
         )
 
     try:
-        encoded = auth_header.split(" ")[1]
-        decoded = base64.b64decode(encoded).decode("utf-8")
-        username, password = decoded.split(":", 1)
+        credentials = base64.b64decode(auth_header[len("Basic "):])
+    except ValueError:
+        credentials = b""
 
-        if username == OPERATOR_USERNAME and password == OPERATOR_PASSWORD:
-            return True
-    except (ValueError, IndexError):
-        pass
+    # Constant-time comparison of the whole "username:password" payload
+    if hmac.compare_digest(credentials, _EXPECTED_CREDENTIALS):
+        return True
 
     raise HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -53,27 +58,16 @@ def verify_operator_auth(request: Request) -> bool:
     )
 
 
-def require_operator_auth(request: Request):
-    """Dependency to require operator authentication."""
-    from app.middleware.host_routing import HostContext
-
-    # Must be on API host
+def _require_api_host(request: Request) -> None:
+    """Dependency to ensure request is on API host."""
     if request.state.host_context != HostContext.API:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Operator admin only available on API host",
         )
 
+
+def require_operator_auth(request: Request, _: None = Depends(_require_api_host)):
+    """Dependency to require operator authentication (on the API host)."""
     verify_operator_auth(request)
     return True
-
-
-
-
-
-
-
-
-
-
-
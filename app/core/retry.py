@@ -1,15 +1,27 @@
 """Retry utilities with exponential backoff."""
 
+import asyncio
 import logging
+import random
 import time
-from typing import Callable, TypeVar, Optional
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
 
-def retry_with_backoff(
+def _jittered(delay: float) -> float:
+    """Pick a wait between half and all of the backoff delay (equal jitter).
+
+    Spreads out retries from callers that failed together (e.g. during a
+    provider outage), so they don't all hit the service again at the same time.
+    """
+    return random.uniform(delay / 2, delay)
+
+
+def retry_with_backoff(  # noqa: UP047
     func: Callable[[], T],
     max_retries: int = 3,
     initial_delay: float = 1.0,
@@ -45,12 +57,13 @@ def retry_with_backoff(
             last_exception = e
             
             if attempt < max_retries:
+                wait = _jittered(delay)
                 if log_errors:
                     logger.warning(
                         f"Attempt {attempt + 1}/{max_retries + 1} failed: {e}. "
-                        f"Retrying in {delay:.2f}s..."
+                        f"Retrying in {wait:.2f}s..."
                     )
-                time.sleep(delay)
+                time.sleep(wait)
                 delay = min(delay * backoff_factor, max_delay)
             else:
                 if log_errors:
@@ -66,9 +79,55 @@ def retry_with_backoff(
     raise RuntimeError("Retry failed without exception")
 
 
+async def retry_with_backoff_async(  # noqa: UP047
+    func: Callable[[], Awaitable[T]],
+    max_retries: int = 3,
+    initial_delay: float = 1.0,
+    max_delay: float = 60.0,
+    backoff_factor: float = 2.0,
+    retryable_exceptions: tuple = (Exception,),
+    log_errors: bool = True,
+) -> T:
+    """Async variant of retry_with_backoff.
 
+    Waits with asyncio.sleep so other tasks keep running between attempts.
 
+    Args:
+        func: Coroutine function to retry
+        max_retries: Maximum number of retry attempts
+        initial_delay: Initial delay in seconds
+        max_delay: Maximum delay in seconds
+        backoff_factor: Multiplier for delay after each retry
+        retryable_exceptions: Tuple of exceptions that should trigger retry
+        log_errors: Whether to log retry attempts
 
+    Returns:
+        Result of await func() if successful
 
+    Raises:
+        Last exception if all retries fail
+    """
+    delay = initial_delay
 
+    for attempt in range(max_retries + 1):
+        try:
+            return await func()
+        except retryable_exceptions as e:
+            if attempt < max_retries:
+                wait = _jittered(delay)
+                if log_errors:
+                    logger.warning(
+                        f"Attempt {attempt + 1}/{max_retries + 1} failed: {e}. "
+                        f"Retrying in {wait:.2f}s..."
+                    )
+                await asyncio.sleep(wait)
+                delay = min(delay * backoff_factor, max_delay)
+            else:
+                if log_errors:
+                    logger.error(
+                        f"All {max_retries + 1} attempts failed. Last error: {e}",
+                        exc_info=True,
+                    )
+                raise
 
+    raise RuntimeError("Retry failed without exception")
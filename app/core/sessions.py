@@ -1,7 +1,7 @@
 """Session management with Redis storage."""
 
-import json
 import logging
+import secrets
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from uuid import UUID
@@ -13,8 +13,29 @@ from app.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Sessions are stored as hashes (one field per value) under session:<id>
+SESSION_TTL = 86400  # 24 hours in seconds
+
+# Update a session only if it still exists: a plain HSET on an expired session
+# would recreate it without a TTL. ARGV is the number of fields to set, then
+# those field/value pairs, then the fields to delete
+_UPDATE_SESSION_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+local set_end = tonumber(ARGV[1]) * 2 + 1
+if set_end > 1 then
+    redis.call('HSET', KEYS[1], unpack(ARGV, 2, set_end))
+end
+if #ARGV > set_end then
+    redis.call('HDEL', KEYS[1], unpack(ARGV, set_end + 1))
+end
+return 1
+"""
+
 # Redis client (lazy initialization)
 _redis_client: Optional[redis.Redis] = None
+_update_session_script = None
 
 
 def get_redis_client() -> redis.Redis:
@@ -26,10 +47,29 @@ def get_redis_client() -> redis.Redis:
             decode_responses=True,
             socket_connect_timeout=5,
             socket_timeout=5,
+            # Pooled connections sit idle between requests: keep them alive
+            # and check them before reuse instead of failing the first command
+            socket_keepalive=True,
+            health_check_interval=30,
         )
     return _redis_client
 
 
+def _get_update_session_script():
+    """Get the registered update script (runs via EVALSHA, loaded on first use)."""
+    global _update_session_script
+    if _update_session_script is None:
+        _update_session_script = get_redis_client().register_script(_UPDATE_SESSION_LUA)
+    return _update_session_script
+
+
+def _encode_value(value: object) -> str:
+    """Encode a session value for the hash (datetimes as ISO 8601, else str)."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
 def create_session(user_id: UUID, csrf_token: Optional[str] = None) -> tuple[str, str]:
     """Create a new session and return (session_id, csrf_token).
     
@@ -40,8 +80,6 @@ def create_session(user_id: UUID, csrf_token: Optional[str] = None) -> tuple[str
     Returns:
         Tuple of (session_id, csrf_token)
     """
-    import secrets
-    
     session_id = secrets.token_urlsafe(32)
     if csrf_token is None:
         csrf_token = secrets.token_urlsafe(32)
@@ -49,19 +87,19 @@ def create_session(user_id: UUID, csrf_token: Optional[str] = None) -> tuple[str
     expires_at = datetime.now(timezone.utc) + timedelta(hours=24)
     
     session_data = {
-        "user_id": str(user_id),
+        "user_id": _encode_value(user_id),
         "csrf_token": csrf_token,
-        "expires_at": expires_at.isoformat(),
+        "expires_at": _encode_value(expires_at),
     }
     
     try:
         redis_client = get_redis_client()
-        # Store session with expiration (24 hours = 86400 seconds)
-        redis_client.setex(
-            f"session:{session_id}",
-            86400,  # 24 hours in seconds
-            json.dumps(session_data),
-        )
+        # Store session with expiration (HSET + EXPIRE in one MULTI/EXEC)
+        key = f"session:{session_id}"
+        pipe = redis_client.pipeline()
+        pipe.hset(key, mapping=session_data)
+        pipe.expire(key, SESSION_TTL)
+        pipe.execute()
         logger.debug(f"Session created: {session_id} for user {user_id}")
     except RedisError as e:
         logger.error(f"Failed to create session in Redis: {e}", exc_info=True)
@@ -84,22 +122,12 @@ def get_session(session_id: str) -> Optional[dict]:
     
     try:
         redis_client = get_redis_client()
-        data = redis_client.get(f"session:{session_id}")
-        
-        if not data:
-            return None
-        
-        session_data = json.loads(data)
+        data = redis_client.hgetall(f"session:{session_id}")
         
-        # Check expiration
-        expires_at = datetime.fromisoformat(session_data["expires_at"])
-        if datetime.now(timezone.utc) > expires_at:
-            # Session expired, delete it
-            delete_session(session_id)
-            return None
-        
-        return session_data
-    except (RedisError, json.JSONDecodeError, KeyError) as e:
+        # Expiry is enforced by the key's TTL (set on create/extend), so a key
+        # that still exists is a live session
+        return data or None
+    except RedisError as e:
         logger.warning(f"Failed to get session {session_id}: {e}")
         return None
 
@@ -109,33 +137,31 @@ def update_session(session_id: str, **kwargs) -> bool:
     
     Args:
         session_id: Session ID
-        **kwargs: Fields to update
+        **kwargs: Fields to update (stored as strings, like create_session's
+            values); None removes the field
     
     Returns:
         True if updated, False if session not found
     """
-    session_data = get_session(session_id)
-    if not session_data:
+    if not session_id or not kwargs:
         return False
     
-    # Update fields
-    session_data.update(kwargs)
+    # Only the given fields are written; the key's TTL is left as it is
+    to_set: list[str] = []
+    to_delete: list[str] = []
+    for field, value in kwargs.items():
+        if value is None:
+            to_delete.append(field)
+        else:
+            to_set += (field, _encode_value(value))
     
     try:
-        redis_client = get_redis_client()
-        # Get TTL to preserve expiration
-        ttl = redis_client.ttl(f"session:{session_id}")
-        if ttl > 0:
-            redis_client.setex(
-                f"session:{session_id}",
-                ttl,
-                json.dumps(session_data),
-            )
-            return True
+        script = _get_update_session_script()
+        args = [len(to_set) // 2, *to_set, *to_delete]
+        return bool(script(keys=[f"session:{session_id}"], args=args))
     except RedisError as e:
         logger.error(f"Failed to update session {session_id}: {e}", exc_info=True)
-    
-    return False
+        return False
 
 
 def delete_session(session_id: str) -> None:
@@ -165,21 +191,15 @@ def extend_session(session_id: str, hours: int = 24) -> bool:
     Returns:
         True if extended, False if session not found
     """
-    session_data = get_session(session_id)
-    if not session_data:
+    if not session_id:
         return False
     
-    expires_at = datetime.now(timezone.utc) + timedelta(hours=hours)
-    session_data["expires_at"] = expires_at.isoformat()
-    
+    # The key's TTL is what expires the session, so extending it is a single
+    # EXPIRE (a no-op returning False when the session is already gone); the
+    # stored expires_at is left as set on creation
     try:
         redis_client = get_redis_client()
-        redis_client.setex(
-            f"session:{session_id}",
-            hours * 3600,  # Convert to seconds
-            json.dumps(session_data),
-        )
-        return True
+        return bool(redis_client.expire(f"session:{session_id}", hours * 3600))
     except RedisError as e:
         logger.error(f"Failed to extend session {session_id}: {e}", exc_info=True)
         return False
@@ -0,0 +1,29 @@
+"""Static assets (CSS/JS) served under /static."""
+
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+
+from fastapi.staticfiles import StaticFiles
+
+STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
+
+# URLs from static_url carry a content hash, so a changed file gets a new URL
+# and the old one can be cached forever
+_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that lets browsers cache assets for a year."""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = _CACHE_CONTROL
+        return response
+
+
+@lru_cache(maxsize=16)
+def static_url(name: str) -> str:
+    """URL for a static file, versioned by its content (computed once per file)."""
+    digest = hashlib.sha256((STATIC_DIR / name).read_bytes()).hexdigest()[:12]
+    return f"/static/{name}?v={digest}"
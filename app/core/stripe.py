@@ -8,12 +8,16 @@ import stripe
 from sqlalchemy.orm import Session
 
 from app.db.models import Tenant
-from app.domain.webhooks import check_idempotency, mark_processed
+from app.domain.webhooks import claim_event, mark_event_processed, release_event
 from app.settings import settings
 
 # Initialize Stripe (will be set from settings)
 stripe.api_key = os.getenv("STRIPE_SECRET_KEY", "")
 
+# Read once at import, like the API key (set in env)
+_STRIPE_PRICE_ID = os.getenv("STRIPE_PRICE_ID", "")
+_STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET", "")
+
 
 def create_checkout_session(
     tenant_id: UUID,
@@ -45,7 +49,7 @@ def create_checkout_session(
         "payment_method_types": ["card"],
         "line_items": [
             {
-                "price": os.getenv("STRIPE_PRICE_ID", ""),  # Set in env
+                "price": _STRIPE_PRICE_ID,
                 "quantity": 1,
             }
         ],
@@ -83,19 +87,30 @@ def process_stripe_webhook(
     """
     from app.domain.webhooks import verify_stripe_signature
 
-    webhook_secret = os.getenv("STRIPE_WEBHOOK_SECRET", "")
-
     # Verify signature
-    if not verify_stripe_signature(payload, signature, webhook_secret):
+    if not verify_stripe_signature(payload, signature, _STRIPE_WEBHOOK_SECRET):
         return {"error": "Invalid signature"}
 
-    event = stripe.Webhook.construct_event(payload, signature, webhook_secret)
+    event = stripe.Webhook.construct_event(payload, signature, _STRIPE_WEBHOOK_SECRET)
 
-    # Check idempotency
+    # Claim the event (idempotency); released again if processing fails so
+    # Stripe's retry is not skipped
     event_id = event.get("id")
-    if check_idempotency("stripe", event_id):
+    if not claim_event("stripe", event_id):
         return {"status": "already_processed"}
 
+    try:
+        _handle_stripe_event(event, db)
+    except Exception:
+        release_event("stripe", event_id)
+        raise
+    mark_event_processed("stripe", event_id)
+
+    return {"status": "processed", "event_type": event["type"]}
+
+
+def _handle_stripe_event(event: dict, db: Session) -> None:
+    """Apply a verified Stripe event to the tenant it belongs to."""
     # Process event
     event_type = event["type"]
     data = event["data"]["object"]
@@ -116,27 +131,24 @@ def process_stripe_webhook(
 
     elif event_type == "customer.subscription.updated":
         # Subscription status updated
+        # Single UPDATE (no SELECT); matches no rows if the tenant is unknown
         subscription = data
-        customer_id = subscription["customer"]
-        tenant = db.query(Tenant).filter_by(stripe_customer_id=customer_id).first()
-        if tenant:
-            tenant.stripe_subscription_id = subscription["id"]
-            tenant.subscription_status = subscription["status"]
-            db.commit()
+        db.query(Tenant).filter_by(stripe_customer_id=subscription["customer"]).update(
+            {
+                Tenant.stripe_subscription_id: subscription["id"],
+                Tenant.subscription_status: subscription["status"],
+            },
+            synchronize_session=False,
+        )
+        db.commit()
 
     elif event_type == "customer.subscription.deleted":
         # Subscription canceled
         subscription = data
-        customer_id = subscription["customer"]
-        tenant = db.query(Tenant).filter_by(stripe_customer_id=customer_id).first()
-        if tenant:
-            tenant.subscription_status = "canceled"
-            db.commit()
-
-    # Mark as processed
-    mark_processed("stripe", event_id)
-
-    return {"status": "processed", "event_type": event_type}
+        db.query(Tenant).filter_by(stripe_customer_id=subscription["customer"]).update(
+            {Tenant.subscription_status: "canceled"}, synchronize_session=False
+        )
+        db.commit()
 
 
 def is_subscription_active(tenant: Tenant) -> bool:
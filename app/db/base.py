@@ -1,10 +1,20 @@
 """Database base and session management."""
 
+import orjson
 from sqlalchemy import create_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
 from app.settings import settings
 
+
+def _json_serializer(value: object) -> str:
+    """Serialize JSON/JSONB column values with orjson.
+
+    Non-string keys are turned into strings, as json.dumps does.
+    """
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 # Configure connection pooling for production
 # pool_size: number of connections to keep open
 # max_overflow: additional connections that can be created on demand
@@ -14,10 +24,13 @@ engine = create_engine(
     settings.database_url,
     pool_pre_ping=True,  # Verify connections before using
     echo=settings.debug,
-    pool_size=10,  # Base pool size
-    max_overflow=20,  # Additional connections on demand
-    pool_timeout=30,  # Wait up to 30s for a connection
-    pool_recycle=3600,  # Recycle connections after 1 hour
+    pool_size=settings.db_pool_size,  # Base pool size (default 10)
+    max_overflow=settings.db_max_overflow,  # Additional connections on demand (default 20)
+    pool_timeout=settings.db_pool_timeout,  # Wait up to 30s for a connection
+    pool_recycle=settings.db_pool_recycle,  # Recycle connections after 1 hour
+    # JSON/JSONB columns (raw_payload, quote items, ...) use orjson both ways
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -0,0 +1,46 @@
+"""Shared Alembic operations for migrations."""
+
+from collections.abc import Sequence
+from typing import Any
+
+import sqlalchemy as sa
+
+from alembic import op
+
+
+def create_index_concurrently(
+    name: str,
+    table: str,
+    columns: Sequence[Any],
+    **kwargs: Any,
+) -> None:
+    """Build an index with CREATE INDEX CONCURRENTLY, replacing an invalid leftover.
+
+    Must run inside op.get_context().autocommit_block(), since CONCURRENTLY
+    can't run in a transaction. A concurrent build that fails or is
+    interrupted leaves an INVALID index behind under the same name: it is never
+    used by the planner but still maintained on every write, and IF NOT EXISTS
+    alone would keep it. So an invalid index is dropped and rebuilt, while a
+    valid one is kept (re-running the migration is a no-op).
+
+    Args:
+        name: Index name
+        table: Table name
+        columns: Columns or expressions, as for op.create_index
+        **kwargs: Extra op.create_index options (unique, postgresql_where, ...)
+    """
+    # Offline (--sql) mode has no database to inspect
+    if not op.get_context().as_sql:
+        invalid = op.get_bind().scalar(
+            sa.text(
+                "SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"
+            ),
+            {"name": name},
+        )
+        if invalid:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+    op.create_index(
+        name, table, columns,
+        postgresql_concurrently=True, if_not_exists=True, **kwargs,
+    )
@@ -6,19 +6,22 @@ from enum import Enum as PyEnum
 
 from sqlalchemy import (
     Boolean,
+    CheckConstraint,
     Column,
     DateTime,
-    Enum,
     ForeignKey,
     Index,
     Integer,
     Numeric,
+    SmallInteger,
     String,
     Text,
     UniqueConstraint,
     func,
+    text,
 )
-from sqlalchemy.dialects.postgresql import ENUM, JSONB, UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.types import TypeDecorator
 
 from app.db.base import Base
 
@@ -68,12 +71,53 @@ class ApprovalStatus(PyEnum):
     REJECTED = "rejected"
 
 
+class EnumCode(TypeDecorator):
+    """Persist a PyEnum as a SMALLINT code.
+
+    The code of a member is its position in ``members``. Codes are what is
+    stored, so existing positions must never be reordered or reused; append
+    new members at the end (and widen the column's CHECK constraint).
+    """
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, members: tuple):
+        """Initialize the type.
+
+        Args:
+            members: Enum members in code order (code 0 first)
+        """
+        super().__init__()
+        self.members = members
+        self._enum_class = type(members[0])
+        self._codes = {member: code for code, member in enumerate(members)}
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if not isinstance(value, self._enum_class):
+            # Accept raw values too, e.g. "owner"
+            value = self._enum_class(value)
+        return self._codes[value]
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self.members[value]
+
+
 class Tenant(Base):
     """Tenant model."""
 
     __tablename__ = "tenants"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        server_default=text("gen_random_uuid()"),
+    )
     name = Column(String(255), nullable=False)
     slug = Column(String(32), unique=True, nullable=True, index=True)
     onboarding_step = Column(Integer, nullable=True)
@@ -89,17 +133,31 @@ class Tenant(Base):
         nullable=False,
     )
 
+    __table_args__ = (
+        # Stripe webhooks: tenant lookup by customer id
+        Index(
+            "idx_tenants_stripe_customer_id",
+            "stripe_customer_id",
+            postgresql_where=text("stripe_customer_id IS NOT NULL"),
+        ),
+    )
+
 
 class User(Base):
     """User model."""
 
     __tablename__ = "users"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        server_default=text("gen_random_uuid()"),
+    )
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
     email = Column(String(255), nullable=False)
     password_hash = Column(String(255), nullable=False)
-    role = Column(String(20), nullable=False)  # Store as string; database enum exists but SQLAlchemy ENUM has compatibility issues
+    role = Column(EnumCode((UserRole.OWNER, UserRole.ATTENDANT)), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(
         DateTime(timezone=True),
@@ -108,7 +166,10 @@ class User(Base):
         nullable=False,
     )
 
-    __table_args__ = (UniqueConstraint("tenant_id", "email", name="uq_users_tenant_email"),)
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "email", name="uq_users_tenant_email"),
+        CheckConstraint("role BETWEEN 0 AND 1", name="ck_users_role"),
+    )
 
 
 class Channel(Base):
@@ -116,7 +177,12 @@ class Channel(Base):
 
     __tablename__ = "channels"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        server_default=text("gen_random_uuid()"),
+    )
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
     waba_id = Column(String(255), nullable=False)
     phone_number_id = Column(String(255), nullable=False)
@@ -131,13 +197,29 @@ class Channel(Base):
         nullable=False,
     )
 
+    __table_args__ = (
+        Index("idx_channels_tenant_id", "tenant_id"),
+        # Webhook routing: at most one active channel per phone number
+        Index(
+            "idx_channels_active_phone_number_id",
+            "phone_number_id",
+            unique=True,
+            postgresql_where=text("is_active"),
+        ),
+    )
+
 
 class Item(Base):
     """Item (product) model."""
 
     __tablename__ = "items"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        server_default=text("gen_random_uuid()"),
+    )
     sku = Column(String(255), unique=True, nullable=False)
     name = Column(String(255), nullable=False)
     unit = Column(String(50), nullable=False)  # kg, m², un, etc.
@@ -155,7 +237,12 @@ class TenantItem(Base):
 
     __tablename__ = "tenant_items"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        server_default=text("gen_random_uuid()"),
+    )
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
     item_id = Column(UUID(as_uuid=True), ForeignKey("items.id"), nullable=False)
     price_base = Column(Numeric(10, 2), nullable=False)
@@ -178,7 +265,12 @@ class PricingRule(Base):
 
     __tablename__ = "pricing_rules"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        server_default=text("gen_random_uuid()"),
+    )
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False, unique=True)
     pix_discount_pct = Column(Numeric(5, 4), nullable=False)  # e.g., 0.05 for 5%
     margin_min_pct = Column(Numeric(5, 4), nullable=False)
@@ -198,7 +290,12 @@ class VolumeDiscount(Base):
 
     __tablename__ = "volume_discounts"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        server_default=text("gen_random_uuid()"),
+    )
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
     item_id = Column(UUID(as_uuid=True), ForeignKey("items.id"), nullable=True)  # null = global
     min_quantity = Column(Numeric(10, 2), nullable=False)
@@ -211,13 +308,20 @@ class VolumeDiscount(Base):
         nullable=False,
     )
 
+    __table_args__ = (Index("idx_volume_discounts_tenant_id", "tenant_id"),)
+
 
 class FreightRule(Base):
     """Freight rules by bairro or CEP range."""
 
     __tablename__ = "freight_rules"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        server_default=text("gen_random_uuid()"),
+    )
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
     bairro = Column(String(255), nullable=True)
     cep_range_start = Column(String(10), nullable=True)
@@ -232,13 +336,22 @@ class FreightRule(Base):
         nullable=False,
     )
 
+    __table_args__ = (
+        Index("idx_freight_rules_tenant_created", "tenant_id", "created_at"),
+    )
+
 
 class Contact(Base):
     """Contact (WhatsApp user) model."""
 
     __tablename__ = "contacts"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        server_default=text("gen_random_uuid()"),
+    )
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
     phone = Column(String(20), nullable=False)  # Normalized phone number
     name = Column(String(255), nullable=True)  # From WhatsApp profile
@@ -258,11 +371,28 @@ class Conversation(Base):
 
     __tablename__ = "conversations"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        server_default=text("gen_random_uuid()"),
+    )
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
     contact_id = Column(UUID(as_uuid=True), ForeignKey("contacts.id"), nullable=False)
     channel_id = Column(UUID(as_uuid=True), ForeignKey("channels.id"), nullable=False)
-    state = Column(Enum(ConversationState), nullable=False)
+    state = Column(
+        EnumCode((
+            ConversationState.INBOUND,
+            ConversationState.CAPTURE_MIN,
+            ConversationState.QUOTE_READY,
+            ConversationState.QUOTE_SENT,
+            ConversationState.WAITING_REPLY,
+            ConversationState.HUMAN_APPROVAL,
+            ConversationState.WON,
+            ConversationState.LOST,
+        )),
+        nullable=False,
+    )
     window_expires_at = Column(DateTime(timezone=True), nullable=True)
     last_message_at = Column(DateTime(timezone=True), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -275,6 +405,8 @@ class Conversation(Base):
 
     __table_args__ = (
         Index("idx_conversations_tenant_state", "tenant_id", "state"),
+        Index("idx_conversations_tenant_last_message", "tenant_id", last_message_at.desc()),
+        CheckConstraint("state BETWEEN 0 AND 7", name="ck_conversations_state"),
     )
 
 
@@ -283,19 +415,29 @@ class Message(Base):
 
     __tablename__ = "messages"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        server_default=text("gen_random_uuid()"),
+    )
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
     conversation_id = Column(UUID(as_uuid=True), ForeignKey("conversations.id"), nullable=True)  # Set by worker
     provider_message_id = Column(String(255), unique=True, nullable=False)  # WhatsApp message ID
-    direction = Column(Enum(MessageDirection), nullable=False)
+    direction = Column(
+        EnumCode((MessageDirection.INBOUND, MessageDirection.OUTBOUND)), nullable=False
+    )
     message_type = Column(String(50), nullable=False)  # text, image, etc.
     raw_payload = Column(JSONB, nullable=False)
     text_content = Column(Text, nullable=True)  # Extracted text
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     __table_args__ = (
-        Index("idx_messages_provider_id", "provider_message_id"),
-        Index("idx_messages_tenant_id", "tenant_id"),
+        # provider_message_id is indexed by its unique constraint
+        Index("idx_messages_tenant_conv_created", "tenant_id", "conversation_id", created_at.desc()),
+        Index("idx_messages_tenant_created", "tenant_id", created_at.desc()),
+        Index("idx_messages_conversation_created", "conversation_id", created_at.desc()),
+        CheckConstraint("direction BETWEEN 0 AND 1", name="ck_messages_direction"),
     )
 
 
@@ -304,10 +446,24 @@ class Quote(Base):
 
     __tablename__ = "quotes"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        server_default=text("gen_random_uuid()"),
+    )
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
     conversation_id = Column(UUID(as_uuid=True), ForeignKey("conversations.id"), nullable=False)
-    status = Column(Enum(QuoteStatus), nullable=False)
+    status = Column(
+        EnumCode((
+            QuoteStatus.DRAFT,
+            QuoteStatus.SENT,
+            QuoteStatus.EXPIRED,
+            QuoteStatus.WON,
+            QuoteStatus.LOST,
+        )),
+        nullable=False,
+    )
     items_json = Column(JSONB, nullable=False)  # Array of {item_id, quantity, unit_price, total}
     subtotal = Column(Numeric(10, 2), nullable=False)
     freight = Column(Numeric(10, 2), nullable=False)
@@ -325,9 +481,16 @@ class Quote(Base):
     )
 
     __table_args__ = (
-        Index("idx_quotes_tenant_id", "tenant_id"),
-        Index("idx_quotes_status", "status"),
+        Index("idx_quotes_tenant_created", "tenant_id", created_at.desc()),
         Index("idx_quotes_tenant_status", "tenant_id", "status"),
+        Index(
+            "idx_quotes_tenant_status_active",
+            "tenant_id",
+            "status",
+            created_at.desc(),
+            postgresql_where=text("status IN (0, 1)"),  # QuoteStatus.DRAFT, QuoteStatus.SENT
+        ),
+        CheckConstraint("status BETWEEN 0 AND 4", name="ck_quotes_status"),
     )
 
 
@@ -336,10 +499,18 @@ class Approval(Base):
 
     __tablename__ = "approvals"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        server_default=text("gen_random_uuid()"),
+    )
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
     quote_id = Column(UUID(as_uuid=True), ForeignKey("quotes.id"), nullable=False)
-    status = Column(Enum(ApprovalStatus), nullable=False)
+    status = Column(
+        EnumCode((ApprovalStatus.PENDING, ApprovalStatus.APPROVED, ApprovalStatus.REJECTED)),
+        nullable=False,
+    )
     reason = Column(Text, nullable=True)  # Why approval needed
     approved_by_user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
     approved_at = Column(DateTime(timezone=True), nullable=True)
@@ -353,6 +524,13 @@ class Approval(Base):
 
     __table_args__ = (
         Index("idx_approvals_tenant_status", "tenant_id", "status"),
+        Index(
+            "idx_approvals_tenant_pending",
+            "tenant_id",
+            created_at.desc(),
+            postgresql_where=text("status = 0"),  # ApprovalStatus.PENDING
+        ),
+        CheckConstraint("status BETWEEN 0 AND 2", name="ck_approvals_status"),
     )
 
 
@@ -361,7 +539,12 @@ class AuditLog(Base):
 
     __tablename__ = "audit_log"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        server_default=text("gen_random_uuid()"),
+    )
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
     entity_type = Column(String(50), nullable=False)  # quote, pricing_rule, etc.
     entity_id = Column(UUID(as_uuid=True), nullable=False)
@@ -371,13 +554,29 @@ class AuditLog(Base):
     after_json = Column(JSONB, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
+    __table_args__ = (
+        Index("idx_audit_log_tenant_created", "tenant_id", created_at.desc()),
+        # Append-only table: a BRIN index is enough for time-range scans
+        Index(
+            "idx_audit_log_created_at_brin",
+            "created_at",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 32},
+        ),
+    )
+
 
 class MessageTemplate(Base):
     """Message template model."""
 
     __tablename__ = "message_templates"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        server_default=text("gen_random_uuid()"),
+    )
     tenant_id = Column(UUID(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
     template_type = Column(String(50), nullable=False)  # 'data_capture', 'quote', 'approval', etc.
     name = Column(String(255), nullable=True)  # Nome descritivo (ex: "Template Padrão")
@@ -15,22 +15,28 @@ redis_client = redis.from_url(settings.redis_url, decode_responses=True)
 IDEMPOTENCY_PREFIX = "webhook:"
 
 
-def check_idempotency(provider: str, event_id: str) -> bool:
-    """Check if webhook event has already been processed.
+def claim_event(provider: str, event_id: str, ttl: int = 120) -> bool:
+    """Claim a webhook event for processing (atomic SET NX).
+
+    Checking and marking in one command means two concurrent deliveries of the
+    same event can't both be processed. The claim is a short-lived "processing"
+    marker: if the worker dies before marking the event processed or releasing
+    it, the claim expires and the provider's retry gets processed.
 
     Args:
         provider: Provider name (e.g., "whatsapp", "stripe")
         event_id: Provider event ID
+        ttl: Time to live of the claim in seconds (default 2 minutes)
 
     Returns:
-        True if already processed, False otherwise
+        True if this call claimed the event, False if it was already claimed
     """
     key = f"{IDEMPOTENCY_PREFIX}{provider}:{event_id}"
-    return redis_client.exists(key) > 0
+    return bool(redis_client.set(key, "processing", nx=True, ex=ttl))
 
 
-def mark_processed(provider: str, event_id: str, ttl: int = 86400 * 7) -> None:
-    """Mark webhook event as processed.
+def mark_event_processed(provider: str, event_id: str, ttl: int = 86400 * 7) -> None:
+    """Mark a claimed event as processed, so redeliveries are skipped.
 
     Args:
         provider: Provider name
@@ -38,7 +44,18 @@ def mark_processed(provider: str, event_id: str, ttl: int = 86400 * 7) -> None:
         ttl: Time to live in seconds (default 7 days)
     """
     key = f"{IDEMPOTENCY_PREFIX}{provider}:{event_id}"
-    redis_client.setex(key, ttl, "processed")
+    redis_client.set(key, "processed", ex=ttl)
+
+
+def release_event(provider: str, event_id: str) -> None:
+    """Release a claimed event whose processing failed, so a redelivery is processed.
+
+    Args:
+        provider: Provider name
+        event_id: Provider event ID
+    """
+    key = f"{IDEMPOTENCY_PREFIX}{provider}:{event_id}"
+    redis_client.delete(key)
 
 
 def verify_stripe_signature(payload: bytes, signature: str, secret: str) -> bool:
@@ -1,8 +1,12 @@
 """FastAPI application entry point."""
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
+from app.adapters.whatsapp.sender import close_async_http_client
 from app.core.logging_config import setup_logging
+from app.core.static import STATIC_DIR, CachedStaticFiles
 from app.middleware.host_routing import host_routing_middleware
 from app.middleware.metrics import MetricsMiddleware
 from app.middleware.rate_limit import limiter, rate_limit_exceeded_handler
@@ -14,10 +18,19 @@ from slowapi.errors import RateLimitExceeded
 # Setup structured logging
 setup_logging()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Release shared clients on shutdown."""
+    yield
+    await close_async_http_client()
+
+
 app = FastAPI(
     title="OrcaZap",
     description="WhatsApp-first quoting assistant for Brazilian construction material stores",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Add host routing middleware
@@ -33,6 +46,9 @@ app.add_middleware(MetricsMiddleware)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
 
+# Static assets (served by nginx in production, see infra)
+app.mount("/static", CachedStaticFiles(directory=STATIC_DIR), name="static")
+
 # Include routers
 # Public router (orcazap.com, www.orcazap.com)
 app.include_router(public.router)
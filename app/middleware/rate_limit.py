@@ -42,10 +42,8 @@ limiter = Limiter(
 
 def rate_limit_exceeded_handler(request: Request, exc: RateLimitExceeded):
     """Custom handler for rate limit exceeded."""
-    logger.warning(
-        f"Rate limit exceeded for {get_rate_limit_key(request)}",
-        extra={"rate_limit_key": get_rate_limit_key(request)},
-    )
+    key = get_rate_limit_key(request)
+    logger.warning("Rate limit exceeded for %s", key, extra={"rate_limit_key": key})
     return _rate_limit_exceeded_handler(request, exc)
 
 
@@ -8,10 +8,12 @@ from fastapi.responses import RedirectResponse
 import bcrypt
 from sqlalchemy.orm import Session
 
+from app.admin.auth import verify_unknown_user_password
 from app.core.dependencies import get_db
 from app.core.sessions import create_session, delete_session
 from app.db.models import Tenant, User, UserRole
 from app.domain.slug import ensure_unique_slug, slugify
+from app.settings import settings
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -46,7 +48,7 @@ def get_password_hash(password: str) -> str:
         password_bytes = password_bytes[:72]
     
     # Generate salt and hash using bcrypt directly
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
     hash_bytes = bcrypt.hashpw(password_bytes, salt)
     
     # Return as string (bcrypt hashes are ASCII-safe)
@@ -58,6 +60,7 @@ def authenticate_user(db: Session, email: str, password: str, tenant_id: UUID) -
     user = db.query(User).filter_by(email=email, tenant_id=tenant_id).first()
 
     if not user:
+        verify_unknown_user_password(password)
         return None
 
     if not verify_password(password, user.password_hash):
@@ -134,7 +137,7 @@ def register_tenant_and_user(
         tenant_id=tenant.id,
         email=email,
         password_hash=password_hash,
-        role=str(UserRole.OWNER.value),  # Explicitly convert to string "owner" for PostgreSQL enum
+        role=UserRole.OWNER,
     )
     db.add(user)
     db.commit()
@@ -9,7 +9,7 @@ from sqlalchemy.orm import Session
 from decimal import Decimal
 
 from app.core.dependencies import get_current_user, get_db
-from app.core.onboarding_templates import render_onboarding_step
+from app.core.onboarding_templates import render_onboarding_step, render_onboarding_step_bytes
 from app.core.sessions import create_session, delete_session
 from app.core.stripe import create_checkout_session, is_subscription_active
 from app.core.templates import render_template
@@ -238,9 +238,8 @@ async def onboarding_step_get(
     if not tenant:
         raise HTTPException(status_code=404, detail="Tenant not found")
 
-    # Render step template
-    context = {}
-    return HTMLResponse(content=render_onboarding_step(step, context))
+    # Render step template (prerendered bytes, nothing to encode per request)
+    return HTMLResponse(content=render_onboarding_step_bytes(step, {}))
 
 
 @router.post("/onboarding/step/{step}")
@@ -8,6 +8,12 @@ class Settings(BaseSettings):
 
     # Database
     database_url: str
+    # Connection pool per process (API worker or RQ worker); keep
+    # processes * (pool_size + max_overflow) under Postgres max_connections
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 30.0  # Seconds to wait for a free connection
+    db_pool_recycle: int = 3600  # Seconds before a connection is replaced
 
     # Redis
     redis_url: str = "redis://localhost:6379/0"
@@ -0,0 +1,17 @@
+// Step 2: add another freight rule to the form
+let ruleCount = 1;
+function addRule() {
+    const form = document.querySelector('form');
+    const ruleGroup = document.createElement('div');
+    ruleGroup.className = 'rule-group';
+    ruleGroup.innerHTML = `
+        <h3>Regra de Frete ${ruleCount + 1}</h3>
+        <input type="text" name="bairro_${ruleCount}" placeholder="Bairro (opcional)">
+        <input type="text" name="cep_start_${ruleCount}" placeholder="CEP Inicial (opcional)">
+        <input type="text" name="cep_end_${ruleCount}" placeholder="CEP Final (opcional)">
+        <input type="number" name="base_freight_${ruleCount}" placeholder="Frete Base (R$)" step="0.01" min="0" required>
+        <input type="number" name="per_kg_${ruleCount}" placeholder="Por kg adicional (R$, opcional)" step="0.01" min="0">
+    `;
+    form.insertBefore(ruleGroup, form.querySelector('.add-rule'));
+    ruleCount++;
+}
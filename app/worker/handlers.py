@@ -1,13 +1,13 @@
 """Worker job handlers."""
 
 import logging
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from typing import Any
 from uuid import UUID
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 
-from app.adapters.whatsapp.sender import send_text_message
+from app.adapters.whatsapp.sender import WHATSAPP_WINDOW, send_text_message
 from app.db.base import SessionLocal
 from app.db.models import (
     Approval,
@@ -64,8 +64,14 @@ def process_inbound_event(job_data: dict[str, Any]) -> None:
 
     db: Session = SessionLocal()
     try:
-        # Idempotency check: if message already processed, skip
-        message = db.query(Message).filter_by(provider_message_id=provider_message_id).first()
+        # Idempotency check: if message already processed, skip. Only the columns
+        # used here are loaded (raw_payload can be large and is already in job_data)
+        message = (
+            db.query(Message)
+            .options(load_only(Message.id, Message.conversation_id))
+            .filter_by(provider_message_id=provider_message_id)
+            .first()
+        )
         if not message:
             logger.warning(
                 f"Message {provider_message_id} not found in DB, skipping",
@@ -162,7 +168,7 @@ def process_inbound_event(job_data: dict[str, Any]) -> None:
                 conversation.state = new_state
 
                 # Set window expiration (24h from now)
-                conversation.window_expires_at = datetime.now(timezone.utc) + timedelta(hours=24)
+                conversation.window_expires_at = datetime.now(timezone.utc) + WHATSAPP_WINDOW
 
                 # Send data capture prompt BEFORE committing state change
                 # This way if send fails, we can rollback
@@ -475,7 +481,7 @@ def process_inbound_event(job_data: dict[str, Any]) -> None:
                         db.add(quote_message)
 
                         # Update window expiration
-                        conversation.window_expires_at = datetime.now(timezone.utc) + timedelta(hours=24)
+                        conversation.window_expires_at = datetime.now(timezone.utc) + WHATSAPP_WINDOW
 
                         # Transition to QUOTE_SENT (auto-approved)
                         new_state = transition(conversation.state, Event.QUOTE_AUTO_OK)
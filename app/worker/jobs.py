@@ -1,10 +1,13 @@
 """RQ job definitions."""
 
+import hashlib
 import logging
+from collections.abc import Iterable
 from typing import Any
 
 import redis
 from rq import Queue
+from rq.job import Job, JobStatus
 
 from app.settings import settings
 
@@ -16,6 +19,36 @@ redis_conn = redis.from_url(settings.redis_url)
 # Default queue
 default_queue = Queue("default", connection=redis_conn)
 
+# Job states in which an inbound event will still run
+_PENDING_STATUSES = frozenset(
+    {JobStatus.QUEUED, JobStatus.STARTED, JobStatus.DEFERRED, JobStatus.SCHEDULED}
+)
+
+
+def inbound_event_job_id(provider_message_id: str) -> str:
+    """Deterministic job ID for a message's inbound event.
+
+    WhatsApp message IDs contain characters RQ doesn't allow in job IDs, so the
+    ID is hashed.
+    """
+    digest = hashlib.sha256(provider_message_id.encode()).hexdigest()
+    return f"inbound-{digest}"
+
+
+def pending_inbound_events(provider_message_ids: Iterable[str]) -> set[str]:
+    """Return the messages whose inbound event job is still queued or running.
+
+    All jobs are fetched in one Redis pipeline (Job.fetch_many).
+    """
+    ids = list(provider_message_ids)
+    jobs = Job.fetch_many([inbound_event_job_id(id_) for id_ in ids], connection=redis_conn)
+    return {
+        id_
+        for id_, job in zip(ids, jobs, strict=True)
+        # Status as loaded by fetch_many, not re-read per job
+        if job is not None and job.get_status(refresh=False) in _PENDING_STATUSES
+    }
+
 
 def enqueue_inbound_event(
     tenant_id: str,
@@ -47,9 +80,35 @@ def enqueue_inbound_event(
     job = default_queue.enqueue(
         "app.worker.handlers.process_inbound_event",
         job_data,
+        job_id=inbound_event_job_id(provider_message_id),
         job_timeout=300,  # 5 minutes
     )
 
     logger.info(f"Enqueued inbound event job {job.id} for message {provider_message_id}")
 
 
+def enqueue_inbound_events(events: list[dict[str, Any]]) -> None:
+    """Enqueue inbound event jobs for a batch of messages.
+
+    All jobs are written through one Redis pipeline (a single round trip)
+    instead of one enqueue call per message.
+
+    Args:
+        events: Job data dicts with the same keys enqueue_inbound_event takes
+    """
+    if not events:
+        return
+
+    jobs = default_queue.enqueue_many(
+        [
+            Queue.prepare_data(
+                "app.worker.handlers.process_inbound_event",
+                (event,),
+                job_id=inbound_event_job_id(event["provider_message_id"]),
+                timeout=300,  # 5 minutes
+            )
+            for event in events
+        ]
+    )
+
+    logger.info(f"Enqueued {len(jobs)} inbound event job(s)")
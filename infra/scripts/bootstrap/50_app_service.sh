@@ -69,8 +69,9 @@ create_systemd_unit() {
     local app_user="${APP_USER:-orcazap}"
     local app_dir="${APP_DIR:-/opt/orcazap}"
     local app_env_file="${APP_ENV_FILE:-/opt/orcazap/.env}"
+    local app_workers="${APP_WORKERS:-2}"
     
-    log_info "Creating systemd unit"
+    log_info "Creating systemd unit ($app_workers uvicorn workers)"
     
     # Render template
     local template_file="$TEMPLATE_DIR/systemd/orcazap-app.service.tmpl"
@@ -85,6 +86,7 @@ create_systemd_unit() {
     unit_content=$(echo "$unit_content" | sed "s|\${APP_USER}|$app_user|g")
     unit_content=$(echo "$unit_content" | sed "s|\${APP_DIR}|$app_dir|g")
     unit_content=$(echo "$unit_content" | sed "s|\${APP_ENV_FILE}|$app_env_file|g")
+    unit_content=$(echo "$unit_content" | sed "s|\${APP_WORKERS}|$app_workers|g")
     
     # Write to temp file
     local temp_unit="/tmp/orcazap-app.service.$$"
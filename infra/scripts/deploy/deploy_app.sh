@@ -79,6 +79,11 @@ deploy_code() {
         
         # Ensure ownership after git operations
         chown -R $app_user:$app_user $app_dir
+        
+        # Publish static assets (nginx serves /static from here)
+        mkdir -p /var/www/orcazap/static
+        cp -a $app_dir/app/static/. /var/www/orcazap/static/
+        chown -R $app_user:$app_user /var/www/orcazap/static
     " || {
         # Rollback on failure
         if [ -n "$git_hash_before" ] && [ "$DRY_RUN" = false ]; then
@@ -3,7 +3,7 @@
 import uuid
 from decimal import Decimal
 from datetime import datetime, timezone
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
 import pytest
 
@@ -137,7 +137,7 @@ def approval(db_session, tenant, quote):
     return approval
 
 
-@patch("app.admin.routes.send_text_message")
+@patch("app.admin.routes.send_text_message_async", new_callable=AsyncMock)
 def test_approve_quote_sends_message(mock_send, db_session, user, quote, conversation, contact, channel, approval):
     """Test that approving a quote sends the message."""
     mock_send.return_value = "wamid.approved123"
@@ -74,29 +74,9 @@ def test_webhook_verification_fails_wrong_mode():
     assert response.status_code == 403
 
 
-@patch("app.adapters.whatsapp.webhook.enqueue_inbound_event")
-@patch("app.adapters.whatsapp.webhook.SessionLocal")
-def test_webhook_receives_message(mock_session_local, mock_enqueue, mock_db_session):
-    """Test webhook receives and processes a text message."""
-    from app.db.models import Channel, Message
-    from uuid import uuid4
-
-    # Setup mock database
-    tenant_id = uuid4()
-    channel_id = uuid4()
-
-    mock_channel = MagicMock(spec=Channel)
-    mock_channel.id = channel_id
-    mock_channel.tenant_id = tenant_id
-    mock_channel.is_active = True
-
-    mock_db_session.query.return_value.filter_by.return_value.first.side_effect = [
-        None,  # Message doesn't exist yet
-        mock_channel,  # Channel found
-    ]
-
-    # Webhook payload
-    payload = {
+def make_payload(*messages: dict) -> dict:
+    """Build a webhook payload carrying the given messages for phone123."""
+    return {
         "object": "whatsapp_business_account",
         "entry": [
             {
@@ -105,18 +85,8 @@ def test_webhook_receives_message(mock_session_local, mock_enqueue, mock_db_sess
                     {
                         "value": {
                             "messaging_product": "whatsapp",
-                            "metadata": {
-                                "phone_number_id": "phone123",
-                            },
-                            "messages": [
-                                {
-                                    "id": "wamid.test123",
-                                    "from": "5511999999999",
-                                    "type": "text",
-                                    "text": {"body": "Hello"},
-                                    "timestamp": "1234567890",
-                                }
-                            ],
+                            "metadata": {"phone_number_id": "phone123"},
+                            "messages": list(messages),
                         }
                     }
                 ],
@@ -124,86 +94,189 @@ def test_webhook_receives_message(mock_session_local, mock_enqueue, mock_db_sess
         ],
     }
 
-    response = client.post("/webhooks/whatsapp", json=payload)
+
+def make_message(message_id: str = "wamid.test123", body: str = "Hello") -> dict:
+    """Build an inbound text message."""
+    return {
+        "id": message_id,
+        "from": "5511999999999",
+        "type": "text",
+        "text": {"body": body},
+        "timestamp": "1234567890",
+    }
+
+
+@pytest.fixture
+def mock_channel(mock_db_session):
+    """Active channel for phone123, returned by the webhook's channel query."""
+    from uuid import uuid4
+
+    from app.db.models import Channel
+
+    channel = MagicMock(spec=Channel)
+    channel.id = uuid4()
+    channel.tenant_id = uuid4()
+    channel.phone_number_id = "phone123"
+    channel.is_active = True
+    mock_db_session.query.return_value.filter.return_value.__iter__.return_value = iter(
+        [channel]
+    )
+    return channel
+
+
+def post_webhook(payload: dict):
+    """POST a payload to the WhatsApp webhook on the API host."""
+    return client.post(
+        app.url_path_for("handle_webhook"),
+        json=payload,
+        headers={"Host": "api.orcazap.com"},
+    )
+
+
+@patch("app.adapters.whatsapp.webhook.enqueue_inbound_events")
+def test_webhook_receives_message(mock_enqueue, mock_db_session, mock_channel):
+    """Test webhook stores a text message and enqueues it for the worker."""
+    message = make_message()
+    # INSERT ... RETURNING: the row was inserted
+    mock_db_session.scalars.return_value = ["wamid.test123"]
+
+    response = post_webhook(make_payload(message))
 
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
 
-    # Verify message was added to DB
-    assert mock_db_session.add.called
-    added_message = mock_db_session.add.call_args[0][0]
-    assert isinstance(added_message, Message)
-    assert added_message.provider_message_id == "wamid.test123"
-    assert added_message.text_content == "Hello"
-
-    # Verify commit was called
+    # One bulk INSERT ... ON CONFLICT DO NOTHING with the message row
+    mock_db_session.scalars.assert_called_once()
+    (row,) = mock_db_session.scalars.call_args[0][1]
+    assert row["tenant_id"] == mock_channel.tenant_id
+    assert row["provider_message_id"] == "wamid.test123"
+    assert row["text_content"] == "Hello"
+    assert row["raw_payload"] == message
+    mock_db_session.add.assert_not_called()
     mock_db_session.commit.assert_called_once()
 
     # Verify job was enqueued
     mock_enqueue.assert_called_once()
-    call_args = mock_enqueue.call_args[1]
-    assert call_args["provider_message_id"] == "wamid.test123"
-    assert call_args["contact_phone"] == "5511999999999"
-    assert call_args["message_text"] == "Hello"
+    (event,) = mock_enqueue.call_args[0][0]
+    assert event["tenant_id"] == str(mock_channel.tenant_id)
+    assert event["channel_id"] == str(mock_channel.id)
+    assert event["provider_message_id"] == "wamid.test123"
+    assert event["contact_phone"] == "5511999999999"
+    assert event["message_text"] == "Hello"
+
+
+@patch("app.adapters.whatsapp.webhook.pending_inbound_events")
+@patch("app.adapters.whatsapp.webhook.enqueue_inbound_events")
+def test_webhook_idempotency(mock_enqueue, mock_pending, mock_db_session, mock_channel):
+    """Test a message already stored and processed is not enqueued again."""
+    mock_db_session.scalars.side_effect = [
+        [],  # INSERT conflicted: already stored
+        [],  # ...and already processed (conversation_id set)
+    ]
 
+    response = post_webhook(make_payload(make_message()))
 
-@patch("app.adapters.whatsapp.webhook.enqueue_inbound_event")
-@patch("app.adapters.whatsapp.webhook.SessionLocal")
-def test_webhook_idempotency(mock_session_local, mock_enqueue, mock_db_session):
-    """Test webhook is idempotent (same message ID processed only once)."""
-    from app.db.models import Channel, Message
-    from uuid import uuid4
+    assert response.status_code == 200
+    assert mock_db_session.scalars.call_count == 2
+    mock_pending.assert_not_called()
+    mock_enqueue.assert_not_called()
 
-    tenant_id = uuid4()
-    channel_id = uuid4()
 
-    # Mock existing message (idempotency check)
-    existing_message = MagicMock(spec=Message)
-    existing_message.provider_message_id = "wamid.test123"
+@patch("app.adapters.whatsapp.webhook.pending_inbound_events", return_value=set())
+@patch("app.adapters.whatsapp.webhook.enqueue_inbound_events")
+def test_webhook_redelivery_enqueues_unprocessed(
+    mock_enqueue, mock_pending, mock_db_session, mock_channel
+):
+    """Test a redelivered message that is stored but never processed is enqueued again."""
+    mock_db_session.scalars.side_effect = [
+        [],  # INSERT conflicted: already stored
+        ["wamid.test123"],  # ...but not processed yet (no conversation_id)
+    ]
 
-    mock_channel = MagicMock(spec=Channel)
-    mock_channel.id = channel_id
-    mock_channel.tenant_id = tenant_id
-    mock_channel.is_active = True
+    response = post_webhook(make_payload(make_message()))
 
-    mock_db_session.query.return_value.filter_by.return_value.first.side_effect = [
-        existing_message,  # Message already exists
-    ]
+    assert response.status_code == 200
+    mock_pending.assert_called_once_with({"wamid.test123"})
+    (event,) = mock_enqueue.call_args[0][0]
+    assert event["provider_message_id"] == "wamid.test123"
+    assert event["message_text"] == "Hello"
 
-    payload = {
-        "object": "whatsapp_business_account",
-        "entry": [
-            {
-                "id": "entry_id",
-                "changes": [
-                    {
-                        "value": {
-                            "messaging_product": "whatsapp",
-                            "metadata": {"phone_number_id": "phone123"},
-                            "messages": [
-                                {
-                                    "id": "wamid.test123",
-                                    "from": "5511999999999",
-                                    "type": "text",
-                                    "text": {"body": "Hello"},
-                                    "timestamp": "1234567890",
-                                }
-                            ],
-                        }
-                    }
-                ],
-            }
-        ],
-    }
 
-    response = client.post("/webhooks/whatsapp", json=payload)
+@patch("app.adapters.whatsapp.webhook.pending_inbound_events", return_value={"wamid.test123"})
+@patch("app.adapters.whatsapp.webhook.enqueue_inbound_events")
+def test_webhook_redelivery_skips_pending_job(
+    mock_enqueue, mock_pending, mock_db_session, mock_channel
+):
+    """Test a redelivered message whose job is still queued is not enqueued twice."""
+    mock_db_session.scalars.side_effect = [[], ["wamid.test123"]]
+
+    response = post_webhook(make_payload(make_message()))
 
     assert response.status_code == 200
+    mock_enqueue.assert_not_called()
 
-    # Verify message was NOT added again (idempotent)
-    mock_db_session.add.assert_not_called()
 
-    # Verify job was NOT enqueued again
-    mock_enqueue.assert_not_called()
+def test_pending_inbound_events_fetches_jobs_at_once():
+    """Test pending jobs are looked up with one fetch_many for all messages."""
+    from rq.job import JobStatus
+
+    from app.worker import jobs
+
+    queued, finished = MagicMock(), MagicMock()
+    queued.get_status.return_value = JobStatus.QUEUED
+    finished.get_status.return_value = JobStatus.FINISHED
+
+    with patch.object(jobs.Job, "fetch_many", return_value=[queued, finished, None]) as fetch:
+        pending = jobs.pending_inbound_events(["wamid.a", "wamid.b", "wamid.c"])
+
+    assert pending == {"wamid.a"}
+    fetch.assert_called_once()
+    assert fetch.call_args[0][0] == [
+        jobs.inbound_event_job_id(message_id) for message_id in ("wamid.a", "wamid.b", "wamid.c")
+    ]
+
 
+@patch("app.adapters.whatsapp.webhook.enqueue_inbound_events")
+def test_webhook_duplicate_in_batch(mock_enqueue, mock_db_session, mock_channel):
+    """Test a message repeated within one webhook is inserted and enqueued once."""
+    mock_db_session.scalars.return_value = ["wamid.test123"]
 
+    response = post_webhook(make_payload(make_message(), make_message()))
+
+    assert response.status_code == 200
+    rows = mock_db_session.scalars.call_args[0][1]
+    assert [row["provider_message_id"] for row in rows] == ["wamid.test123"]
+    (event,) = mock_enqueue.call_args[0][0]
+    assert event["provider_message_id"] == "wamid.test123"
+
+
+@patch("app.adapters.whatsapp.webhook.enqueue_inbound_events")
+def test_webhook_skips_malformed_messages(mock_enqueue, mock_db_session, mock_channel):
+    """Test malformed messages are skipped without failing the rest of the webhook."""
+    # No from/timestamp, plus a null field and unmodelled nested data
+    message = {
+        "id": "wamid.test123",
+        "type": "text",
+        "text": {"body": "Hello"},
+        "context": {"from": "5511888888888", "id": "wamid.prev"},
+        "errors": None,
+    }
+    mock_db_session.scalars.return_value = ["wamid.test123"]
+
+    payload = make_payload(
+        {"from": "5511999999999", "type": "text"},  # no id
+        {"id": "wamid.bad", "text": "not an object"},
+        "not a message",
+        message,
+    )
+    payload["entry"][0]["changes"][0]["value"]["statuses"] = [{"unexpected": ["shape"]}]
+
+    response = post_webhook(payload)
+
+    assert response.status_code == 200
+    (row,) = mock_db_session.scalars.call_args[0][1]
+    assert row["provider_message_id"] == "wamid.test123"
+    # Stored exactly as received
+    assert row["raw_payload"] == message
+    (event,) = mock_enqueue.call_args[0][0]
+    assert event["contact_phone"] == ""
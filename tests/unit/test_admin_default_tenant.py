@@ -0,0 +1,36 @@
+"""Unit tests for the admin login's default tenant cache."""
+
+import uuid
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.admin import routes
+
+
+@pytest.fixture
+def db():
+    """Mock session whose oldest-tenant query returns a new id on each call."""
+    session = MagicMock()
+    query = session.query.return_value.order_by.return_value.limit.return_value
+    query.scalar.side_effect = lambda: uuid.uuid4()
+    routes.invalidate_default_tenant_id()
+    yield session
+    routes.invalidate_default_tenant_id()
+
+
+def test_default_tenant_id_is_cached(db):
+    """The tenant is looked up once and reused by later logins."""
+    tenant_id = routes._get_default_tenant_id(db)
+
+    assert routes._get_default_tenant_id(db) == tenant_id
+    assert db.query.call_count == 1
+
+
+def test_invalidate_refetches_default_tenant_id(db):
+    """After invalidation the next login looks the tenant up again."""
+    tenant_id = routes._get_default_tenant_id(db)
+    routes.invalidate_default_tenant_id()
+
+    assert routes._get_default_tenant_id(db) != tenant_id
+    assert db.query.call_count == 2
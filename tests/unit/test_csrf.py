@@ -0,0 +1,43 @@
+"""Unit tests for CSRF token validation."""
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.core.csrf import validate_csrf_token
+
+
+def make_request(cookie_token: str | None = None, header_token: str | None = None) -> Request:
+    """Build a request carrying the CSRF cookie and/or header."""
+    headers = []
+    if cookie_token is not None:
+        headers.append((b"cookie", f"csrf_token={cookie_token}".encode("latin-1")))
+    if header_token is not None:
+        headers.append((b"x-csrf-token", header_token.encode("latin-1")))
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": headers})
+
+
+def test_validate_csrf_token_matching():
+    """Test that a header token matching the cookie passes."""
+    validate_csrf_token(make_request("abc123", "abc123"))
+
+
+def test_validate_csrf_token_mismatch():
+    """Test that a header token different from the cookie is rejected."""
+    with pytest.raises(HTTPException) as exc_info:
+        validate_csrf_token(make_request("abc123", "xyz789"))
+    assert exc_info.value.status_code == 403
+
+
+def test_validate_csrf_token_missing():
+    """Test that a missing cookie is rejected."""
+    with pytest.raises(HTTPException) as exc_info:
+        validate_csrf_token(make_request(header_token="abc123"))
+    assert exc_info.value.status_code == 403
+
+
+def test_validate_csrf_token_non_ascii():
+    """Test that a non-ASCII token is rejected with 403, not a server error."""
+    with pytest.raises(HTTPException) as exc_info:
+        validate_csrf_token(make_request("abc123", "abcé23"))
+    assert exc_info.value.status_code == 403
@@ -0,0 +1,97 @@
+"""Unit tests for the WhatsApp sender's retry behaviour."""
+
+import json
+import uuid
+from collections.abc import Callable
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.adapters.whatsapp import sender
+from app.db.models import Channel
+
+
+@pytest.fixture
+def channel():
+    """Create an unsaved channel with a phone number id."""
+    return Channel(id=uuid.uuid4(), phone_number_id="123456")
+
+
+@pytest.fixture
+def responses():
+    """Serve queued responses through a mock transport and count the calls."""
+    queue: list[httpx.Response | Callable[[httpx.Request], httpx.Response]] = []
+    calls: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        response = queue.pop(0)
+        # Callables stand in for transport errors
+        return response(request) if callable(response) else response
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    with (
+        patch.object(sender, "_client", client),
+        patch.object(sender.settings, "whatsapp_access_token", "test-token"),
+        patch("app.core.retry.time.sleep"),
+    ):
+        yield queue, calls
+    client.close()
+
+
+def test_send_retries_server_errors(channel, responses):
+    """Test that 5xx responses are retried until the send succeeds."""
+    queue, calls = responses
+    queue.extend(
+        [
+            httpx.Response(503),
+            httpx.Response(502),
+            httpx.Response(200, json={"messages": [{"id": "wamid.1"}]}),
+        ]
+    )
+
+    assert sender.send_text_message(channel, "+5511999999999", "Oi") == "wamid.1"
+    assert len(calls) == 3
+
+
+def test_send_retries_dropped_connections(channel, responses):
+    """Test that a connection closed by the server (e.g. HTTP/2 GOAWAY) is retried."""
+    queue, calls = responses
+
+    def dropped(request: httpx.Request) -> httpx.Response:
+        raise httpx.RemoteProtocolError("Server disconnected", request=request)
+
+    queue.extend([dropped, httpx.Response(200, json={"messages": [{"id": "wamid.1"}]})])
+
+    assert sender.send_text_message(channel, "+5511999999999", "Oi") == "wamid.1"
+    assert len(calls) == 2
+
+
+def test_send_does_not_retry_client_errors(channel, responses):
+    """Test that 4xx responses fail on the first attempt."""
+    queue, calls = responses
+    queue.append(httpx.Response(400, json={"error": {"message": "bad"}}))
+
+    with pytest.raises(sender._WhatsAppClientError) as exc_info:
+        sender.send_text_message(channel, "+5511999999999", "Oi")
+    assert exc_info.value.status == 400
+    assert len(calls) == 1
+
+
+def test_send_posts_json_body(channel, responses):
+    """Test that the message is sent as a JSON body with auth headers."""
+    queue, calls = responses
+    queue.append(httpx.Response(200, json={"messages": [{"id": "wamid.1"}]}))
+
+    sender.send_text_message(channel, "+5511999999999", "Oi")
+
+    request = calls[0]
+    assert str(request.url) == "https://graph.facebook.com/v18.0/123456/messages"
+    assert request.headers["Authorization"] == "Bearer test-token"
+    assert json.loads(request.content) == {
+        "messaging_product": "whatsapp",
+        "to": "+5511999999999",
+        "type": "text",
+        "text": {"body": "Oi"},
+    }
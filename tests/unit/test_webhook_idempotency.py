@@ -0,0 +1,43 @@
+"""Unit tests for webhook event claims."""
+
+from unittest.mock import patch
+
+import fakeredis
+import pytest
+
+from app.domain import webhooks
+
+
+@pytest.fixture
+def redis_client():
+    """Swap the module's Redis client for an in-memory one."""
+    client = fakeredis.FakeRedis(decode_responses=True)
+    with patch.object(webhooks, "redis_client", client):
+        yield client
+
+
+def test_claim_is_short_lived_until_processed(redis_client):
+    """A claim only holds briefly; marking it processed keeps it for days."""
+    assert webhooks.claim_event("stripe", "evt_1") is True
+    assert redis_client.get("webhook:stripe:evt_1") == "processing"
+    assert redis_client.ttl("webhook:stripe:evt_1") <= 120
+
+    webhooks.mark_event_processed("stripe", "evt_1")
+    assert redis_client.get("webhook:stripe:evt_1") == "processed"
+    assert redis_client.ttl("webhook:stripe:evt_1") > 86400
+
+
+def test_duplicate_claim_is_rejected(redis_client):
+    """A second delivery of a claimed or processed event is not claimed."""
+    assert webhooks.claim_event("stripe", "evt_1") is True
+    assert webhooks.claim_event("stripe", "evt_1") is False
+
+    webhooks.mark_event_processed("stripe", "evt_1")
+    assert webhooks.claim_event("stripe", "evt_1") is False
+
+
+def test_released_claim_can_be_claimed_again(redis_client):
+    """Releasing a failed claim lets the provider's retry be processed."""
+    assert webhooks.claim_event("stripe", "evt_1") is True
+    webhooks.release_event("stripe", "evt_1")
+    assert webhooks.claim_event("stripe", "evt_1") is True